@@ -1,8 +1,16 @@
-import requests
-import pandas as pd
-import time
+import argparse
 from datetime import datetime
 
+from core import metrics
+from core.alpha_vantage import fetch_all
+from core.export import FORMATS, ReportWriter, append_history, render, report_path
+from core.lazy import lazy
+from core.ledger import default_ledger
+from core.store import default_store
+
+# Loaded on first use: `--help` and `import alpha_screener` stay cheap
+pd = lazy("pandas")
+
 # --- YOUR ARSENAL (8 Keys) ---
 API_KEYS = [
     'Q0MHC85REM11RRSP', 'NDWP3ECHB89B2HB2', 'P62QZ651UY5YGIIA',
@@ -31,101 +39,49 @@ assets = [
     {"symbol": "FXI", "type": "ETF", "name": "China Large-Cap"}
 ]
 
-def get_data_with_deep_retry(asset, start_key_index):
-    # TRY ALL KEYS if necessary. Don't give up after 3.
-    for attempt in range(len(API_KEYS)):
-        current_key_idx = (start_key_index + attempt) % len(API_KEYS)
-        key = API_KEYS[current_key_idx]
-        
-        # Only print the asset name once
-        if attempt == 0:
-            print(f"Analyzing {asset['name']}...", end=" ", flush=True)
-        
-        result, status = fetch_data(asset, key)
-        
-        if result:
-            print(f"DONE. ({result['20D Momentum']:.2f}%)")
-            return result
-        
-        # If we hit a rate limit, we silently try the next key
-        if status == "LIMIT_HIT":
-            continue 
-            
-    print("FAILED (Checked all 8 keys - Limits or Errors).")
-    return None
-
-def fetch_data(asset, api_key):
-    symbol = asset['symbol']
-    
-    # 1. Endpoint Selection
-    if asset['type'] == "CRYPTO":
-        url = f'https://www.alphavantage.co/query?function=DIGITAL_CURRENCY_DAILY&symbol={symbol}&market=USD&apikey={api_key}'
-        data_key = "Time Series (Digital Currency Daily)"
-    elif asset['type'] == "FX":
-        url = f'https://www.alphavantage.co/query?function=FX_DAILY&from_symbol={symbol}&to_symbol=USD&apikey={api_key}'
-        data_key = "Time Series FX (Daily)"
-    else: 
-        url = f'https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&apikey={api_key}'
-        data_key = "Time Series (Daily)"
-
-    try:
-        r = requests.get(url)
-        data = r.json()
-
-        # 2. Check for Limits
-        if "Note" in data or "Information" in data:
-            return None, "LIMIT_HIT"
-        
-        if data_key not in data:
-            return None, "DATA_MISSING"
-
-        # 3. Dynamic Key Finding (Universal)
-        dates = list(data[data_key].keys())
-        latest_row = data[data_key][dates[0]]
-        
-        # Find ANY column with "close" in the name
-        close_key = next((k for k in latest_row.keys() if "close" in k), None)
-        if not close_key:
-            return None, "KEY_ERROR"
-
-        # 4. Calculation
-        price_now = float(data[data_key][dates[0]][close_key])
-        price_20d = float(data[data_key][dates[20]][close_key])
-        
-        mom = ((price_now - price_20d) / price_20d) * 100
-        
-        return {
-            "Asset": asset['name'],
-            "Price": round(price_now, 4),
-            "20D Momentum": mom
-        }, "SUCCESS"
-
-    except Exception:
-        return None, "SYSTEM_ERROR"
+def report(asset, result, status):
+    # Results arrive in completion order, one line per asset
+    if result:
+        source = " [local]" if status == "CACHED" else ""
+        print(f"{asset['name']}... DONE. ({result['20D Momentum']:.2f}%){source}")
+    elif status == "ALL_KEYS_EXHAUSTED":
+        print(f"{asset['name']}... FAILED (All {len(API_KEYS)} keys exhausted for today).")
+    else:
+        print(f"{asset['name']}... FAILED ({status}).")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alpha Vantage deep momentum scan.")
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet", help="Report file format (streamed as results arrive)")
+    parser.add_argument("--excel", action="store_true", help="Also write the formatted ranking as .xlsx")
+    parser.add_argument("--metrics", help="Write run metrics here (.prom/.txt = Prometheus text, else JSON)")
+    args = parser.parse_args()
+
     print(f"--- DEEP RETRY SCAN: {datetime.now().strftime('%H:%M:%S')} ---")
-    results = []
-    
-    for i, asset in enumerate(assets):
-        # Start with a distributed key index
-        start_key_index = i % len(API_KEYS)
-        
-        res = get_data_with_deep_retry(asset, start_key_index)
-        if res:
-            results.append(res)
-        
-        # 0.1s delay for speed
-        time.sleep(0.1) 
+    filename = report_path("Deep_Scan", args.format)
+    with ReportWriter(filename, args.format) as writer:
+        def on_result(asset, result, status):
+            report(asset, result, status)
+            if result:
+                writer.write(result)
+
+        # All assets in flight at once; the key pool routes each request to a key with quota left.
+        # The ledger remembers today's spent keys and replies across runs.
+        fetched = fetch_all(assets, API_KEYS, on_result=on_result, store=default_store(), ledger=default_ledger())
+    results = [fetched[a['symbol']][0] for a in assets if fetched[a['symbol']][0]]
 
     if results:
         df = pd.DataFrame(results)
         df = df.sort_values(by="20D Momentum", ascending=False)
-        df['20D Momentum'] = df['20D Momentum'].apply(lambda x: f"{x:.2f}%")
+        append_history(df, "Deep_Scan")
+        df = render(df, percent=['20D Momentum'])
         
-        filename = f"Deep_Scan_{datetime.now().strftime('%Y%m%d')}.xlsx"
-        df.to_excel(filename, index=False)
+        if args.excel:
+            df.to_excel(filename.rsplit(".", 1)[0] + ".xlsx", index=False)
         
         print("\n--- GLOBAL MOMENTUM RANKING ---")
         print(df.to_string(index=False))
-        print(f"\n[SUCCESS] Report saved: {filename}")
\ No newline at end of file
+        print(f"\n[SUCCESS] Report saved: {filename}")
+
+    if args.metrics:
+        metrics.REGISTRY.write(args.metrics)
+        print(f"Metrics written: {args.metrics}")
\ No newline at end of file
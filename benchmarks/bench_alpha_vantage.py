@@ -0,0 +1,118 @@
+"""Serial deep-retry vs. the concurrent key-pool engine, against a local stand-in.
+
+Run from the repo root:  python -m benchmarks.bench_alpha_vantage
+"""
+import os
+import tempfile
+import threading
+import time
+
+import core.alpha_vantage as av
+from alpha_screener import API_KEYS, assets
+from core.ledger import ApiLedger
+
+LATENCY = 0.4
+EXHAUSTED = set(API_KEYS[:3])  # keys that already burnt their daily quota
+
+
+class _Reply:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class StandInAlphaVantage:
+    def __init__(self):
+        self.calls = 0
+        self.wasted = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(LATENCY)
+        if params["apikey"] in EXHAUSTED:
+            with self._lock:
+                self.wasted += 1
+            return _Reply({"Information": "Our standard API rate limit is 25 requests per day."})
+        _, data_key = av.build_request({"symbol": "X", "type": _type(params)}, "")
+        series = {f"2024-01-{31 - i:02d}": {"4. close": str(100 + i)} for i in range(30)}
+        return _Reply({data_key: series})
+
+    def close(self):
+        pass
+
+
+def _type(params):
+    return {"DIGITAL_CURRENCY_DAILY": "CRYPTO", "FX_DAILY": "FX"}.get(params["function"], "ETF")
+
+
+# Throttle replies seen in the wild and how each must be classified
+LIMIT_MESSAGES = {
+    "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute and "
+    "500 calls per day. Please visit https://www.alphavantage.co/premium/ if you would like to target "
+    "a higher API call frequency.": "LIMIT_HIT",
+    "Please consider spreading out your free API requests more sparingly (1 request per second).": "LIMIT_HIT",
+    "Our standard API rate limit is 25 requests per day.": "DAILY_LIMIT",
+}
+
+
+def check_limit_messages():
+    for msg, expected in LIMIT_MESSAGES.items():
+        for field in ("Note", "Information"):
+            got = av.limit_status({field: msg})
+            assert got == expected, f"{field} {msg[:40]!r}...: {got}, expected {expected}"
+    print(f"Limit replies     : {len(LIMIT_MESSAGES)} message texts classified as expected")
+
+
+def run():
+    check_limit_messages()
+
+    # Old path: one asset at a time, keys tried serially from a rotating start index
+    old = StandInAlphaVantage()
+    t0 = time.perf_counter()
+    for i, asset in enumerate(assets):
+        for attempt in range(len(API_KEYS)):
+            key = API_KEYS[(i + attempt) % len(API_KEYS)]
+            _, status = av.fetch_data(asset, key, old)
+            if status != "DAILY_LIMIT":
+                break
+        time.sleep(0.1)
+    serial = time.perf_counter() - t0
+
+    new = StandInAlphaVantage()
+    av.make_session = lambda pool_size=16: new
+    t0 = time.perf_counter()
+    out = av.fetch_all(assets, API_KEYS)
+    concurrent = time.perf_counter() - t0
+
+    ok = sum(1 for r, _ in out.values() if r)
+    print(f"{len(assets)} assets, {len(API_KEYS)} keys ({len(EXHAUSTED)} exhausted), {LATENCY*1000:.0f} ms latency")
+    print(f"Serial deep retry : {serial:6.2f}s  calls={old.calls:3d}  wasted on dead keys={old.wasted}")
+    print(f"Key-pool engine   : {concurrent:6.2f}s  calls={new.calls:3d}  wasted on dead keys={new.wasted}  ok={ok}")
+
+    # Persistent ledger: the first run learns, the second (same trading day) replays
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = ApiLedger(os.path.join(tmp, "av.sqlite"))
+        for label in ("Ledger, first run ", "Ledger, second run"):
+            stand_in = StandInAlphaVantage()
+            av.make_session = lambda pool_size=16: stand_in
+            t0 = time.perf_counter()
+            out = av.fetch_all(assets, API_KEYS, ledger=ledger)
+            elapsed = time.perf_counter() - t0
+            ok = sum(1 for r, _ in out.values() if r)
+            print(f"{label}: {elapsed:6.2f}s  calls={stand_in.calls:3d}  wasted on dead keys={stand_in.wasted}  ok={ok}")
+
+        # A later run with no cached replies still skips the keys the ledger saw die
+        ledger._conn.execute("DELETE FROM responses")
+        stand_in = StandInAlphaVantage()
+        av.make_session = lambda pool_size=16: stand_in
+        av.fetch_all(assets, API_KEYS, ledger=ledger)
+        print(f"Ledger, cold cache: calls={stand_in.calls:3d}  wasted on dead keys={stand_in.wasted}")
+        ledger.close()
+
+
+if __name__ == "__main__":
+    run()
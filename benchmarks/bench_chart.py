@@ -0,0 +1,54 @@
+"""Deep Dive chart payload: every daily candle vs. the downsampled view.
+
+Run from the repo root:  python -m benchmarks.bench_chart
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from core.chart import downsample, ema
+
+
+def synthetic_bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+    return pd.DataFrame({"Open": np.roll(close, 1), "High": close + spread, "Low": close - spread,
+                         "Close": close, "Volume": rng.integers(1_000, 10_000, n).astype(float)},
+                        index=pd.bdate_range("2015-01-01", periods=n))
+
+
+def figure_json(candles, line):
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=candles.index, open=candles['Open'], high=candles['High'], low=candles['Low'], close=candles['Close']))
+    fig.add_trace(go.Scatter(x=candles.index, y=line, mode='lines'))
+    fig.update_layout(template="plotly_dark", height=600, xaxis_rangeslider_visible=False)
+    return fig.to_json()
+
+
+def run(years=(1, 3, 5, 10), repeat=5):
+    for y in years:
+        bars = synthetic_bars(252 * y)
+        line = ema(bars['Close'], 50)
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            full = figure_json(bars, bars['Close'].ewm(span=50, adjust=False).mean())
+        t_full = (time.perf_counter() - t0) / repeat
+
+        # EMA already cached per (symbol, timeframe, span): only downsample + render
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            candles, lines, label = downsample(bars, {'EMA': line})
+            small = figure_json(candles, lines['EMA'])
+        t_small = (time.perf_counter() - t0) / repeat
+
+        print(f"{y:2d}y: {len(bars):5d} daily -> {len(candles):4d} {label} candles | "
+              f"payload {len(full)/1024:7.1f} KB -> {len(small)/1024:6.1f} KB | "
+              f"build {t_full*1e3:6.1f} ms -> {t_small*1e3:5.1f} ms")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,55 @@
+"""Full-width COT parse vs. the header-resolved, column-projected parse.
+
+Run from the repo root:  python -m benchmarks.bench_cot_parse [years] [markets]
+"""
+import io
+import sys
+import time
+import zipfile
+
+import pandas as pd
+
+from benchmarks.fixtures import cot_zip
+from core import cot
+
+
+def legacy_parse(content):
+    # The original dashboard path: every column, find_col over the full frame, object Market
+    z = zipfile.ZipFile(io.BytesIO(content))
+    df_year = pd.read_csv(z.open(z.namelist()[0]), low_memory=False)
+    found = cot.resolve_schema(df_year.columns)
+    df_temp = df_year[list(found.values())].copy()
+    df_temp.columns = list(found.keys())
+    df_temp['Date'] = pd.to_datetime(df_temp['DateRaw'], format='%y%m%d', errors='coerce')
+    return df_temp
+
+
+def legacy_combine(all_data):
+    full_df = pd.concat(all_data).sort_values(by='Date').drop_duplicates()
+    for col in cot.NUM_COLS:
+        if col in full_df.columns:
+            full_df[col] = pd.to_numeric(full_df[col], errors='coerce').fillna(0)
+    full_df['Net_NC'] = full_df.get('NC_Long', 0) - full_df.get('NC_Short', 0)
+    full_df['Net_C'] = full_df.get('C_Long', 0) - full_df.get('C_Short', 0)
+    full_df['Net_NR'] = full_df.get('NR_Long', 0) - full_df.get('NR_Short', 0)
+    return full_df.dropna(subset=['Date'])
+
+
+def measure(parse, combine, blobs):
+    t0 = time.perf_counter()
+    df = combine([parse(b) for b in blobs])
+    return time.perf_counter() - t0, df.memory_usage(deep=True).sum() / 2**20, len(df)
+
+
+def run(years=11, markets=300):
+    blobs = [cot_zip(2015 + i, markets) for i in range(years)]
+    old_t, old_mb, rows = measure(legacy_parse, legacy_combine, blobs)
+    new_t, new_mb, _ = measure(cot.parse_year, cot.combine, blobs)
+    print(f"{years} yearly files, {markets} markets, {rows:,} rows in the combined frame")
+    print(f"Full-width parse : {old_t:6.2f}s  {old_mb:7.1f} MB resident")
+    print(f"Projected parse  : {new_t:6.2f}s  {new_mb:7.1f} MB resident")
+    return {"old_s": old_t, "new_s": new_t, "old_mb": old_mb, "new_mb": new_mb, "rows": rows}
+
+
+if __name__ == "__main__":
+    run(*map(int, sys.argv[1:3]))
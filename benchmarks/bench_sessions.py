@@ -0,0 +1,41 @@
+"""Upstream Yahoo calls vs. number of concurrent dashboard sessions hitting a cold cache.
+
+Run from the repo root:  python -m benchmarks.bench_sessions
+"""
+import tempfile
+import threading
+
+from benchmarks.bench_fetch import StandInYahoo
+from core import providers
+from core.cache import cached
+from core.store import OHLCVStore
+from macro_scanner import assets
+
+
+def run(session_counts=(1, 10, 50, 200)):
+    symbols = [a['symbol'] for a in assets]
+    for n in session_counts:
+        yahoo = StandInYahoo(latency=0.2)
+        providers.use(yahoo)
+        store = OHLCVStore(tempfile.mkdtemp())
+
+        @cached(f"bench_sessions_{n}", ttl=3600, maxsize=1)
+        def prices():
+            return store.history(symbols, period="3mo")
+
+        # Every session reruns at the same moment the cache is cold
+        barrier = threading.Barrier(n)
+
+        def session():
+            barrier.wait()
+            prices()
+
+        threads = [threading.Thread(target=session) for _ in range(n)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        print(f"{n:4d} sessions -> {yahoo.calls:3d} upstream symbol requests "
+              f"(coalesced waits: {prices.cache.coalesced})")
+
+
+if __name__ == "__main__":
+    run()
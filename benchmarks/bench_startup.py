@@ -0,0 +1,78 @@
+"""Cold-start budget for the scheduled entry points.
+
+Every entry point runs in a fresh interpreter, best of N wall time, minus a
+bare `python -c pass`, so the number is what our own import graph costs. A
+second run under -X importtime lists which heavy libraries got loaded: a CLI
+answering --help (or a module merely imported for its config) should load none.
+
+Run from the repo root:  python -m benchmarks.bench_startup [--repeat N]
+Exits 1 if any entry point is over budget or loads a heavy library.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("pandas", "numpy", "pyarrow", "requests", "yfinance", "plotly")
+
+# Seconds on top of the bare interpreter; the full pandas stack is ~0.6s here
+BUDGETS = {
+    "alpha_screener.py --help": 0.10,
+    "macro_scanner.py --help": 0.10,
+    "universe_scan.py --help": 0.10,
+    "import alpha_screener": 0.10,
+    "import macro_scanner": 0.10,
+    "import core.cot": 0.10,
+    "import core.export": 0.05,
+}
+
+
+def _argv(entry):
+    if entry.startswith("import "):
+        return [sys.executable, "-c", entry]
+    script, *args = entry.split()
+    return [sys.executable, os.path.join(ROOT, script), *args]
+
+
+def wall(argv, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(argv, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def heavy_imports(argv):
+    """Top-level heavy packages the entry point imported, from -X importtime."""
+    out = subprocess.run([argv[0], "-X", "importtime", *argv[1:]], cwd=ROOT,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    loaded = {line.rsplit("|", 1)[-1].strip() for line in out.splitlines() if line.startswith("import time:")}
+    return [name for name in HEAVY if name in loaded]
+
+
+def run(repeat=5):
+    bare = wall([sys.executable, "-c", "pass"], repeat)
+    print(f"Bare interpreter: {bare * 1000:.0f} ms (subtracted below)\n")
+    print(f"{'entry point':28s} {'ms':>6s} {'budget':>7s}  heavy imports")
+    failed = []
+    for entry, budget in BUDGETS.items():
+        argv = _argv(entry)
+        cost = max(wall(argv, repeat) - bare, 0.0)
+        heavy = heavy_imports(argv)
+        over = cost > budget or heavy
+        if over:
+            failed.append(entry)
+        flag = "  OVER BUDGET" if over else ""
+        print(f"{entry:28s} {cost * 1000:6.0f} {budget * 1000:7.0f}  {', '.join(heavy) or '-'}{flag}")
+    if failed:
+        print(f"\n{len(failed)} entry point(s) over budget: {', '.join(failed)}")
+    return not failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per entry point (best one counts)")
+    sys.exit(0 if run(parser.parse_args().repeat) else 1)
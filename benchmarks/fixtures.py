@@ -0,0 +1,185 @@
+"""Synthetic market data for the benchmarks (no network)."""
+import functools
+import io
+import json
+import re
+import time
+import zipfile
+from zlib import crc32
+
+import numpy as np
+import pandas as pd
+
+from core.market_data import FIELDS
+from core.providers import Provider, Reply
+from core.store import period_start
+
+# Legacy futures-only layout: identifiers, then the same position block for
+# (All), (Old) and (Other), then changes, % of OI and trader counts.
+_GROUPS = [
+    "Noncommercial Positions-Long", "Noncommercial Positions-Short", "Noncommercial Positions-Spreading",
+    "Commercial Positions-Long", "Commercial Positions-Short",
+    "Total Reportable Positions-Long", "Total Reportable Positions-Short",
+    "Nonreportable Positions-Long", "Nonreportable Positions-Short",
+]
+_ID_COLS = [
+    "Market and Exchange Names", "As of Date in Form YYMMDD", "As of Date in Form YYYY-MM-DD",
+    "CFTC Contract Market Code", "CFTC Market Code in Initials", "CFTC Region Code", "CFTC Commodity Code",
+]
+
+
+def cot_columns():
+    cols = list(_ID_COLS)
+    for scope in ("All", "Old", "Other"):
+        cols.append(f"Open Interest ({scope})")
+        cols += [f"{g} ({scope})" for g in _GROUPS]
+    cols.append("Change in Open Interest (All)")
+    cols += [f"Change in {g} (All)" for g in _GROUPS]
+    for scope in ("All", "Old", "Other"):
+        cols += [f"% of OI-{g} ({scope})" for g in _GROUPS]
+        cols.append(f"Traders-Total ({scope})")
+        cols += [f"Traders-{g} ({scope})" for g in _GROUPS if "Nonreportable" not in g]
+    for scope in ("All", "Old", "Other"):
+        cols += [f"Concentration-Gross LT = {n} TDR-{side} ({scope})" for n in (4, 8) for side in ("Long", "Short")]
+    cols += ["Contract Units", "CFTC Contract Market Code (Quotes)", "CFTC Market Code in Initials (Quotes)",
+             "CFTC Commodity Code (Quotes)"]
+    return cols
+
+
+def market_names(n_markets):
+    real = [
+        "GOLD - COMMODITY EXCHANGE INC.", "SILVER - COMMODITY EXCHANGE INC.",
+        "CRUDE OIL, LIGHT SWEET - NEW YORK MERCANTILE EXCHANGE", "EURO FX - CHICAGO MERCANTILE EXCHANGE",
+        "BRITISH POUND STERLING - CHICAGO MERCANTILE EXCHANGE", "JAPANESE YEN - CHICAGO MERCANTILE EXCHANGE",
+        "BITCOIN - CHICAGO MERCANTILE EXCHANGE", "E-MINI S&P 500 - CHICAGO MERCANTILE EXCHANGE",
+        "NASDAQ-100 CONSOLIDATED - CHICAGO MERCANTILE EXCHANGE", "10-YEAR U.S. TREASURY NOTES - CHICAGO BOARD OF TRADE",
+    ]
+    return real + [f"SYNTHETIC CONTRACT {i:04d} - TEST EXCHANGE" for i in range(max(0, n_markets - len(real)))]
+
+
+def cot_year_frame(year, n_markets=300, seed=0):
+    rng = np.random.default_rng(seed + year)
+    dates = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="W-TUE")
+    markets = market_names(n_markets)
+    cols = cot_columns()
+    n = len(dates) * len(markets)
+    data = {c: rng.integers(0, 500_000, n) for c in cols[len(_ID_COLS):-4]}
+    df = pd.DataFrame(data)
+    df.insert(0, _ID_COLS[0], np.tile(markets, len(dates)))
+    df.insert(1, _ID_COLS[1], np.repeat(dates.strftime("%y%m%d"), len(markets)))
+    df.insert(2, _ID_COLS[2], np.repeat(dates.strftime("%Y-%m-%d"), len(markets)))
+    for i, c in enumerate(_ID_COLS[3:], start=3):
+        df.insert(i, c, "X%03d" % (i * 7))
+    for c in cols[-4:]:
+        df[c] = "(CONTRACTS OF 1,000 UNITS)" if c == "Contract Units" else "ABC"
+    return df[cols]
+
+
+def cot_zip(year, n_markets=300, seed=0):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("annual.txt", cot_year_frame(year, n_markets, seed).to_csv(index=False))
+    return buf.getvalue()
+
+
+@functools.lru_cache(maxsize=64)
+def cached_cot_zip(year, n_markets=300, seed=0):
+    return cot_zip(year, n_markets, seed)
+
+
+# --- OHLCV FOR FAKE UNIVERSES ---
+ANCHOR = pd.Timestamp("2000-01-03")
+
+
+def fake_universe(n):
+    return [f"SYN{i:05d}" for i in range(n)]
+
+
+def _symbol_params(symbols):
+    seeds = np.array([crc32(s.encode()) for s in symbols], dtype=np.uint64)
+    u = lambda k: ((seeds * np.uint64(2654435761 + 97 * k)) % np.uint64(1_000_003)).astype(float) / 1_000_003
+    return {"drift": (u(1) - 0.5) * 6e-4, "amp": 0.05 + 0.25 * u(2), "period": 60 + 340 * u(3),
+            "phase": 2 * np.pi * u(4), "level": 20 + 180 * u(5), "seed": seeds.astype(float) % 9973}
+
+
+def ohlcv_frame(symbols, dates):
+    """Wide (field, symbol) OHLCV, same layout as yfinance.download(group_by="column").
+
+    Prices are a closed-form function of (symbol, date), so any window of a
+    symbol lines up with any other window of it: incremental top-ups and
+    full downloads agree, just like the real thing.
+    """
+    symbols = list(symbols)
+    p = _symbol_params(symbols)
+    dates = pd.DatetimeIndex(dates)
+    t = ((dates.tz_localize(None) if dates.tz is not None else dates) - ANCHOR) / pd.Timedelta(days=1)
+    t = t.to_numpy(dtype=float)[:, None]
+    noise = np.sin(t * 12.9898 + p["seed"] * 78.233) * 43758.5453
+    noise = (noise - np.floor(noise)) - 0.5            # deterministic "random" in [-0.5, 0.5)
+    log_close = p["drift"] * t + p["amp"] * np.sin(2 * np.pi * t / p["period"] + p["phase"]) + 0.02 * noise
+    close = p["level"] * np.exp(log_close)
+    open_ = close * np.exp(0.01 * np.roll(noise, 1, axis=0))
+    spread = 1 + 0.01 * np.abs(noise)
+    fields = {"Open": open_, "High": np.maximum(open_, close) * spread, "Low": np.minimum(open_, close) / spread,
+              "Close": close, "Volume": np.round(1e6 * (1.5 + noise))}
+    columns = pd.MultiIndex.from_product([FIELDS, symbols])
+    return pd.DataFrame(np.hstack([fields[f] for f in FIELDS]), index=dates, columns=columns)
+
+
+_AV_KEYS = {"TIME_SERIES_DAILY": "Time Series (Daily)", "FX_DAILY": "Time Series FX (Daily)",
+            "DIGITAL_CURRENCY_DAILY": "Time Series (Digital Currency Daily)"}
+
+
+class SyntheticProvider(Provider):
+    """Deterministic Yahoo / Alpha Vantage / CFTC stand-in for any universe size.
+
+    `latency` is added once per request (a batched download counts as one).
+    """
+
+    def __init__(self, latency=0.0, n_markets=300, max_years=20):
+        self.latency = latency
+        self.n_markets = n_markets
+        self.max_years = max_years
+        self.calls = 0
+
+    def _dates(self, period="3mo", start=None, interval="1d"):
+        end = pd.Timestamp.today().normalize()
+        first = pd.Timestamp(start) if start is not None else period_start(period)
+        days = pd.bdate_range(first if first is not None else end - pd.DateOffset(years=self.max_years), end)
+        if interval.endswith("d"):
+            return days
+        # Intraday: regular-session bars (14:30-21:00 UTC) up to now
+        step = pd.Timedelta(interval.replace("m", "min"))
+        stamps = pd.DatetimeIndex(np.concatenate([
+            pd.date_range(d + pd.Timedelta(hours=14, minutes=30), d + pd.Timedelta(hours=21), freq=step, inclusive="left")
+            for d in days])).tz_localize("UTC")
+        return stamps[stamps <= pd.Timestamp.now(tz="UTC")]
+
+    def download(self, symbols, period="3mo", start=None, interval="1d", **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return ohlcv_frame(symbols, self._dates(period, start, interval))
+
+    def session(self, pool_size=16):
+        return _SyntheticSession(self)
+
+
+class _SyntheticSession:
+    def __init__(self, provider):
+        self.provider = provider
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.provider.calls += 1
+        time.sleep(self.provider.latency)
+        year = re.search(r"deacot(\d{4})\.zip", url)
+        if year:
+            return Reply(cached_cot_zip(int(year.group(1)), self.provider.n_markets))
+        symbol = params.get("symbol") or params.get("from_symbol")
+        frame = ohlcv_frame([symbol], self.provider._dates("6mo"))
+        series = {d.strftime("%Y-%m-%d"): {"1. open": str(o), "2. high": str(h), "3. low": str(l), "4. close": str(c)}
+                  for d, o, h, l, c in zip(frame.index, *(frame[f][symbol] for f in FIELDS[:4]))}
+        return Reply(json.dumps({_AV_KEYS[params["function"]]: series}).encode())
+
+    def close(self):
+        pass
+
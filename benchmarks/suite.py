@@ -0,0 +1,137 @@
+"""Reproducible benchmark suite on the synthetic provider, stored run over run.
+
+Times the end-to-end universe scan, COT load + filter, and the momentum
+recompute as universe size / years grow, with the Python heap peak of each
+case (parent process only: the scan's scoring workers are not traced). Every run is appended to a JSONL history and compared with the last
+run of the same case, so regressions show up as a delta.
+
+Run from the repo root:  python -m benchmarks.suite [--quick] [--out PATH]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.fixtures import SyntheticProvider, cached_cot_zip, fake_universe
+from core import providers
+from core.cot import CotCache, CotIndex, add_positioning
+from core.market_data import close_prices, fetch_history
+from core.momentum import PriceMatrix, momentum_frame
+from core.scan import scan_universe
+
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "benchmarks", "results.jsonl")
+REGRESSION = 0.25  # flag cases more than 25% slower than the previous run
+
+SIZES = {"scan": (500, 2000, 5000), "cot": (3, 10), "momentum": (100, 1000, 5000)}
+QUICK = {"scan": (500,), "cot": (3,), "momentum": (100, 1000)}
+
+
+def measure(fn, repeat=3):
+    """(best-of-`repeat` seconds, Python heap peak in MB) for fn.
+
+    Timing runs untraced (tracemalloc slows allocation-heavy code several
+    times over); one extra traced call gives the memory peak.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 2**20
+
+
+# --- CASES ---
+def case_scan(n):
+    symbols = fake_universe(n)
+    return lambda: scan_universe(symbols, k=25, batch_size=200, fetch_workers=2, workers=1)
+
+
+def case_cot(years):
+    root = tempfile.mkdtemp()
+    session = SyntheticProvider(n_markets=300).session()
+    this_year = time.localtime().tm_year
+    for y in range(this_year - years, this_year + 1):
+        cached_cot_zip(y, 300)  # build the zips up front: the case times our parse, not the fixture
+
+    def run():
+        # Cold cache: download, parse, positioning stats, index, then the COT tab's filters
+        index = CotIndex(add_positioning(CotCache(tempfile.mkdtemp(dir=root), session).load(years)))
+        index.since("GOLD - COMMODITY EXCHANGE INC.", index.latest['Date'].max() - pd.Timedelta(days=365))
+        index.extremes('Net_NC', 15)
+    return run
+
+
+def case_momentum(n):
+    close = close_prices(fetch_history(fake_universe(n), period="3mo"))
+    # The dashboard's slider path: one matrix build, then every lookback on it
+    def run():
+        pm = PriceMatrix.from_close(close)
+        for lookback in range(10, 61):
+            momentum_frame(pm, lookback=lookback, short=5, min_bars=25)
+    return run
+
+
+CASES = {"scan": case_scan, "cot": case_cot, "momentum": case_momentum}
+
+
+# --- HISTORY ---
+def _revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def load_previous(path):
+    """Latest stored result per (case, size)."""
+    previous = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                row = json.loads(line)
+                previous[(row["case"], row["size"])] = row
+    return previous
+
+
+def run(sizes=SIZES, out=DEFAULT_OUT):
+    providers.use(SyntheticProvider())
+    previous = load_previous(out)
+    stamp = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "revision": _revision(), "machine": platform.node(),
+             "python": platform.python_version(), "cpus": os.cpu_count()}
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+
+    print(f"{'case':10s} {'size':>6s} {'seconds':>9s} {'peak MB':>9s}  vs last run")
+    with open(out, "a") as f:
+        for case, case_sizes in sizes.items():
+            for size in case_sizes:
+                seconds, peak = measure(CASES[case](size))
+                row = dict(stamp, case=case, size=size, seconds=round(seconds, 4), peak_mb=round(peak, 1))
+                f.write(json.dumps(row) + "\n")
+
+                last = previous.get((case, size))
+                delta = ""
+                if last:
+                    change = seconds / last["seconds"] - 1
+                    delta = f"{change:+.0%} ({last['revision'] or last['time']})"
+                    if change > REGRESSION:
+                        delta += "  <-- REGRESSION"
+                print(f"{case:10s} {size:6d} {seconds:9.3f} {peak:9.1f}  {delta}")
+    print(f"\nResults appended to {out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Smallest sizes only")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="JSONL results history")
+    args = parser.parse_args()
+    run(QUICK if args.quick else SIZES, args.out)
@@ -0,0 +1 @@
+# Shared building blocks for the scanners and the dashboard.
@@ -0,0 +1,309 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core import metrics, providers
+from core.lazy import lazy
+
+pd = lazy("pandas")
+
+# --- ALPHA VANTAGE ENGINE ---
+# Concurrent fetcher: every request goes through one pooled Session and is
+# routed by a KeyPool straight to a key that still has capacity.
+
+BASE_URL = "https://www.alphavantage.co/query"
+
+# Free-tier limits, per key
+CALLS_PER_MINUTE = 5
+CALLS_PER_DAY = 25
+
+
+class KeyPool:
+    """Per-key token buckets plus a daily budget.
+
+    acquire() hands out the key with the most capacity right now, blocks until
+    a bucket refills if every live key is momentarily empty, and returns None
+    once every key is known to be exhausted for the day. A key that has not
+    answered successfully yet only gets one request in flight, so a dead key
+    costs a single probe instead of a whole burst.
+
+    `usage` seeds today's state from an ApiLedger: keys already exhausted are
+    skipped, spent calls come off the budget, and keys that answered earlier
+    today start out proven.
+    """
+
+    def __init__(self, keys, per_minute=CALLS_PER_MINUTE, per_day=CALLS_PER_DAY, usage=None):
+        self.keys = list(keys)
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        now = time.monotonic()
+        self._state = {
+            k: {"tokens": self.capacity, "stamp": now, "left": per_day, "inflight": 0, "proven": False}
+            for k in keys
+        }
+        for k, used in (usage or {}).items():
+            st = self._state.get(k)
+            if st is None:
+                continue
+            st["left"] = 0 if used["exhausted"] else max(per_day - used["calls"], 0)
+            st["proven"] = used["calls"] > used["limits"]
+        self._cond = threading.Condition()
+
+    def _refill(self, st, now):
+        st["tokens"] = min(self.capacity, st["tokens"] + (now - st["stamp"]) * self.rate)
+        st["stamp"] = now
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                live = [(k, st) for k, st in self._state.items() if st["left"] > 0]
+                if not live:
+                    return None
+                ready = [(k, st) for k, st in live if st["proven"] or st["inflight"] == 0]
+                if not ready:
+                    # Only unproven keys with a probe in flight: wait for an answer
+                    self._cond.wait()
+                    continue
+                for _, st in ready:
+                    self._refill(st, now)
+                key, st = max(ready, key=lambda kv: (kv[1]["tokens"], kv[1]["left"]))
+                if st["tokens"] >= 1:
+                    st["tokens"] -= 1
+                    st["left"] -= 1
+                    st["inflight"] += 1
+                    return key
+                # Sleep until the fullest bucket has a whole token again
+                self._cond.wait(timeout=(1 - st["tokens"]) / self.rate)
+
+    def release(self, key, proven=True):
+        """The request came back without a rate-limit reply."""
+        with self._cond:
+            st = self._state[key]
+            st["inflight"] -= 1
+            st["proven"] = st["proven"] or proven
+            self._cond.notify_all()
+
+    def throttle(self, key):
+        """Per-minute limit hit: empty the bucket so the key cools down."""
+        with self._cond:
+            st = self._state[key]
+            st["inflight"] -= 1
+            st["tokens"] = min(st["tokens"], 0.0)
+            st["stamp"] = time.monotonic()
+            self._cond.notify_all()
+
+    def exhaust(self, key):
+        """Daily limit hit: never hand this key out again today."""
+        with self._cond:
+            st = self._state[key]
+            st["inflight"] -= 1
+            st["left"] = 0
+            self._cond.notify_all()
+
+    def remaining(self):
+        with self._cond:
+            return {k: st["left"] for k, st in self._state.items()}
+
+
+def make_session(pool_size=16):
+    # Pooled keep-alive session from the current provider (live, recorded or replayed)
+    return providers.current().session(pool_size)
+
+
+def build_request(asset, api_key):
+    # 1. Endpoint Selection
+    symbol = asset['symbol']
+    if asset['type'] == "CRYPTO":
+        params = {"function": "DIGITAL_CURRENCY_DAILY", "symbol": symbol, "market": "USD"}
+        data_key = "Time Series (Digital Currency Daily)"
+    elif asset['type'] == "FX":
+        params = {"function": "FX_DAILY", "from_symbol": symbol, "to_symbol": "USD"}
+        data_key = "Time Series FX (Daily)"
+    else:
+        params = {"function": "TIME_SERIES_DAILY", "symbol": symbol}
+        data_key = "Time Series (Daily)"
+    params["apikey"] = api_key
+    return params, data_key
+
+
+def limit_status(data):
+    """Classify an Alpha Vantage throttle reply, or None if it isn't one."""
+    msg = data.get("Note") or data.get("Information")
+    if msg is None:
+        return None
+    msg = str(msg).lower()
+    # The classic throttle Note quotes both limits ("5 calls per minute and 500
+    # calls per day"), so the short-window wording has to win
+    if "per minute" in msg or "per second" in msg:
+        return "LIMIT_HIT"
+    if "per day" in msg or "daily" in msg:
+        return "DAILY_LIMIT"
+    return "LIMIT_HIT"
+
+
+def parse_series(series):
+    """Alpha Vantage {date: {"1. open": ..., "4. close": ...}} -> OHLCV frame."""
+    bars = pd.DataFrame.from_dict(series, orient="index")
+    # Dynamic Key Finding (Universal): take the first column naming each field
+    cols = {}
+    for field in ("open", "high", "low", "close", "volume"):
+        match = next((c for c in bars.columns if field in c), None)
+        if match:
+            cols[match] = field.capitalize()
+    bars = bars[list(cols)].rename(columns=cols).astype(float)
+    bars.index = pd.to_datetime(bars.index)
+    return bars.sort_index()
+
+
+def read_reply(data, data_key):
+    """Decoded JSON reply -> (bars, status)."""
+    try:
+        # Check for Limits
+        status = limit_status(data)
+        if status:
+            return None, status
+
+        if data_key not in data:
+            return None, "DATA_MISSING"
+
+        with metrics.timer("av_parse_seconds"):
+            bars = parse_series(data[data_key])
+        if 'Close' not in bars.columns:
+            return None, "KEY_ERROR"
+        return bars, "SUCCESS"
+
+    except Exception as e:
+        metrics.failure("av.parse", e)
+        return None, "SYSTEM_ERROR"
+
+
+def fetch_reply(asset, api_key, session=None):
+    """One live request: (raw JSON, bars, status)."""
+    params, data_key = build_request(asset, api_key)
+    t0 = time.perf_counter()
+    try:
+        data = (session or make_session(1)).get(BASE_URL, params=params, timeout=15).json()
+    except Exception as e:
+        metrics.observe("av_request_seconds", time.perf_counter() - t0, status="SYSTEM_ERROR")
+        metrics.failure("av.request", e, symbol=asset['symbol'])
+        return None, None, "SYSTEM_ERROR"
+    bars, status = read_reply(data, data_key)
+    metrics.observe("av_request_seconds", time.perf_counter() - t0, status=status)
+    return data, bars, status
+
+
+def fetch_series(asset, api_key, session=None):
+    return fetch_reply(asset, api_key, session)[1:]
+
+
+def momentum_row(asset, bars):
+    close = bars['Close'].dropna()
+    if len(close) < 21:
+        return None
+    price_now = float(close.iloc[-1])
+    price_20d = float(close.iloc[-21])
+
+    mom = ((price_now - price_20d) / price_20d) * 100
+
+    return {
+        "Asset": asset['name'],
+        "Price": round(price_now, 4),
+        "20D Momentum": mom
+    }
+
+
+def fetch_data(asset, api_key, session=None):
+    bars, status = fetch_series(asset, api_key, session)
+    if bars is None:
+        return None, status
+    result = momentum_row(asset, bars)
+    return (result, "SUCCESS") if result else (None, "DATA_MISSING")
+
+
+def fetch_one(asset, pool, session, store=None, ledger=None):
+    """Fetch one asset, rerouting to another key on every rate-limit reply,
+    at most once per key (as the serial deep retry did).
+
+    With a store, a recently synced series is served from disk without
+    touching a key, and every fresh download is merged into it. With a
+    ledger, a reply already received for the series' current date is
+    reused (see ledger.data_date), and every live request is counted against its key.
+    """
+    result, status = _fetch_one(asset, pool, session, store, ledger)
+    metrics.inc("av_results_total", status=status)
+    if result is None:
+        metrics.failure("av.asset", status, symbol=asset['symbol'])
+    return result, status
+
+
+def _fetch_one(asset, pool, session, store, ledger):
+    symbol = asset['symbol']
+    if store is not None:
+        fresh = store.is_fresh("av", symbol)
+        metrics.inc("av_cache_total", layer="store", result="hit" if fresh else "miss")
+        if fresh:
+            result = momentum_row(asset, store.read("av", symbol))
+            if result:
+                return result, "CACHED"
+
+    params, data_key = build_request(asset, None)
+    if ledger is not None:
+        data = ledger.response(params)
+        bars = read_reply(data, data_key)[0] if data is not None else None
+        metrics.inc("av_cache_total", layer="ledger", result="hit" if bars is not None else "miss")
+        if bars is not None:
+            if store is not None:
+                bars = store.write("av", symbol, bars)
+            result = momentum_row(asset, bars)
+            if result:
+                return result, "CACHED"
+
+    for attempt in range(len(pool.keys)):
+        # Time spent waiting for a key's bucket to refill, i.e. rate-limit backoff
+        with metrics.timer("av_key_wait_seconds"):
+            key = pool.acquire()
+        if key is None:
+            return None, "ALL_KEYS_EXHAUSTED"
+        if attempt:
+            metrics.inc("av_retries_total")
+        data, bars, status = fetch_reply(asset, key, session)
+        if ledger is not None:
+            ledger.record(key, status)
+            if status == "SUCCESS":
+                ledger.save_response(params, data)
+        if status == "DAILY_LIMIT":
+            metrics.inc("av_rate_limit_total", kind="daily")
+            pool.exhaust(key)
+            continue
+        if status == "LIMIT_HIT":
+            metrics.inc("av_rate_limit_total", kind="minute")
+            pool.throttle(key)
+            continue
+        # A network error says nothing about the key itself
+        pool.release(key, proven=status != "SYSTEM_ERROR")
+        if bars is None:
+            return None, status
+        if store is not None:
+            bars = store.write("av", symbol, bars)
+        result = momentum_row(asset, bars)
+        return (result, status) if result else (None, "DATA_MISSING")
+    # Every attempt got a rate-limit reply: give up on this asset, not on the keys
+    return None, "LIMIT_HIT"
+
+
+def fetch_all(assets, keys, max_workers=None, on_result=None, store=None, ledger=None):
+    """Screen every asset concurrently. Returns {symbol: (result, status)}."""
+    workers = max_workers or max(len(assets), 1)
+    pool = KeyPool(keys, usage=ledger.usage() if ledger is not None else None)
+    session = make_session(pool_size=workers)
+    out = {}
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(fetch_one, a, pool, session, store, ledger): a for a in assets}
+        for fut in as_completed(futures):
+            asset = futures[fut]
+            out[asset['symbol']] = fut.result()
+            if on_result:
+                on_result(asset, *out[asset['symbol']])
+    session.close()
+    return out
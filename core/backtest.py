@@ -0,0 +1,136 @@
+import itertools
+
+from core.lazy import lazy
+from core.momentum import is_accelerating, is_bullish
+
+np = lazy("numpy")
+pd = lazy("pandas")
+
+# --- MOMENTUM STRATEGY BACKTESTER ---
+# Rule (the scanners' own signal): at each rebalance, hold an equal-weight long
+# book of every asset that is BULLISH and ACCELERATING; cash otherwise.
+# The whole (lookback x short x rebalance) grid is evaluated as array ops:
+# momentum for every window is one shifted divide over the (dates x assets)
+# matrix, and each rebalance schedule is one gather along the time axis.
+
+LOOKBACKS = tuple(range(10, 61))       # the dashboard slider range
+SHORTS = (3, 5, 8, 10, 15, 20)
+REBALANCES = (1, 5, 10, 21)
+COLUMNS = ["Lookback", "Short", "Rebalance", "CAGR", "Vol", "Sharpe", "MaxDD", "Total", "Turnover"]
+
+
+def aligned_closes(close):
+    """Business-day calendar, forward-filled, dropping leading rows before every asset has a price.
+
+    Weekend rows only exist because crypto trades them; kept, they would be
+    zero-return days for every other asset and stretch every bar count.
+    """
+    if close.empty:  # an empty download has no date index to filter
+        return close
+    close = close.sort_index().ffill()
+    close = close[close.index.dayofweek < 5]
+    return close.dropna(axis=1, how="all").dropna()
+
+
+def years_spanned(index):
+    """Elapsed calendar time of a date index, in years."""
+    return (index[-1] - index[0]).days / 365.25 if len(index) > 1 else 0.0
+
+
+def window_momentum(prices, windows):
+    """(windows x dates x assets) % change from the .iloc[-w] bar, as the scanners compute it.
+
+    NaN where history is short.
+    """
+    windows = np.asarray(windows)
+    T = prices.shape[0]
+    out = np.full((len(windows), T, prices.shape[1]), np.nan, dtype=np.float32)
+    for i, w in enumerate(windows):  # one vector op per window, not per date or asset
+        lag = max(int(w) - 1, 0)
+        if lag == 0:
+            out[i] = 0
+        elif w <= T:
+            out[i, lag:] = (prices[lag:] / prices[:-lag] - 1) * 100
+    return out
+
+
+def _holdings(mom_long, mom_short, rebalances, T):
+    """Boolean books (L x S x R x dates x assets), decided at each rebalance close."""
+    signal = is_bullish(mom_long)[:, None] & is_accelerating(mom_long[:, None], mom_short[None])
+    signal &= ~np.isnan(mom_long)[:, None]
+    # Day t holds what was decided at the last rebalance at or before t
+    idx = np.stack([(np.arange(T) // r) * r for r in rebalances])  # (R x T)
+    return signal[:, :, idx]
+
+
+def _metrics(daily, years):
+    """daily: (... x T) portfolio returns over `years` of elapsed time -> dict of (...) metric arrays."""
+    # Annualise by the rows the calendar actually holds per year, not a fixed 252
+    per_year = daily.shape[-1] / years if years > 0 else daily.shape[-1]
+    log_eq = np.cumsum(np.log1p(daily), axis=-1)
+    equity = np.exp(log_eq)
+    total = equity[..., -1] - 1
+    vol = daily.std(axis=-1) * np.sqrt(per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(vol > 0, daily.mean(axis=-1) * per_year / vol, 0.0)
+    peak = np.maximum.accumulate(equity, axis=-1)
+    max_dd = (equity / peak - 1).min(axis=-1)
+    cagr = (1 + total) ** (1 / years) - 1 if years > 0 else total
+    return {"CAGR": cagr, "Vol": vol, "Sharpe": sharpe, "MaxDD": max_dd, "Total": total}
+
+
+def sweep(close, lookbacks=LOOKBACKS, shorts=SHORTS, rebalances=REBALANCES, cost_bps=0.0, chunk=8):
+    """Backtest every (lookback, short, rebalance) combination.
+
+    `close` is a wide (dates x assets) Close frame. Returns one row per
+    configuration with CAGR / Vol / Sharpe / MaxDD / Total / Turnover.
+    Lookbacks are processed `chunk` at a time to cap peak memory.
+    Fewer than two aligned bars give an empty frame.
+    """
+    close = aligned_closes(close)
+    if len(close) < 2:
+        return pd.DataFrame(columns=COLUMNS)
+    prices = close.to_numpy(dtype=np.float64)
+    T = prices.shape[0]
+    years = years_spanned(close.index)
+    # Return earned on day t+1 by the book held at the close of day t
+    fwd = np.zeros_like(prices, dtype=np.float32)
+    fwd[:-1] = prices[1:] / prices[:-1] - 1
+
+    mom_s = window_momentum(prices, shorts)
+    rows = []
+    for start in range(0, len(lookbacks), chunk):
+        lbs = lookbacks[start:start + chunk]
+        mom_l = window_momentum(prices, lbs)
+        book = _holdings(mom_l, mom_s, rebalances, T)           # (l, S, R, T, N) bool
+        count = book.sum(axis=-1, dtype=np.float32)
+        weights = book / np.maximum(count, 1)[..., None]
+        daily = (weights * fwd).sum(axis=-1)                     # (l, S, R, T)
+        turn = np.abs(np.diff(weights, axis=-2, prepend=0)).sum(axis=-1)
+        daily = daily - turn * cost_bps / 1e4
+        m = _metrics(daily[..., :-1], years)
+        m["Turnover"] = turn.sum(axis=-1) / years if years > 0 else turn.sum(axis=-1)
+        for (i, lb), (j, sh), (k, rb) in itertools.product(enumerate(lbs), enumerate(shorts), enumerate(rebalances)):
+            rows.append((lb, sh, rb) + tuple(float(m[key][i, j, k]) for key in
+                                               ("CAGR", "Vol", "Sharpe", "MaxDD", "Total", "Turnover")))
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def equity_curve(close, lookback, short, rebalance, cost_bps=0.0):
+    """Daily equity of one configuration next to an equal-weight buy & hold benchmark."""
+    close = aligned_closes(close)
+    prices = close.to_numpy(dtype=np.float64)
+    T = prices.shape[0]
+    fwd = np.zeros_like(prices)
+    fwd[:-1] = prices[1:] / prices[:-1] - 1
+    book = _holdings(window_momentum(prices, [lookback]), window_momentum(prices, [short]), [rebalance], T)[0, 0, 0]
+    weights = book / np.maximum(book.sum(axis=-1), 1)[:, None]
+    turn = np.abs(np.diff(weights, axis=0, prepend=0)).sum(axis=-1)
+    daily = (weights * fwd).sum(axis=-1) - turn * cost_bps / 1e4
+    bench = fwd.mean(axis=-1)
+    # Day t's return lands on day t+1
+    return pd.DataFrame({
+        "Strategy": np.cumprod(1 + np.concatenate([[0], daily[:-1]])),
+        "Equal Weight": np.cumprod(1 + np.concatenate([[0], bench[:-1]])),
+        "Holdings": book.sum(axis=-1),
+    }, index=close.index)
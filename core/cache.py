@@ -0,0 +1,238 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from core import metrics
+
+# --- NAMED CACHE LAYER ---
+# Each dataset (momentum prices, chart history, COT years...) lives in its own
+# named cache with its own TTL and LRU size, so refreshing one never drops the
+# others. Caches are process-wide: every dashboard session shares them.
+#
+# Loads are single-flight: concurrent misses on one key wait for the same
+# fetch. Caches created with refresh_ahead reload entries in the background
+# once they are that fraction of their TTL old, so readers keep getting the
+# current value and never see the cold reload.
+
+_registry = {}
+_registry_lock = threading.Lock()
+_background = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+_refresher = None
+
+REFRESH_POLL = 5  # seconds between refresh-ahead sweeps
+
+
+class _Entry:
+    __slots__ = ("value", "loaded", "expires", "accessed", "loader")
+
+    def __init__(self, value, ttl, loader):
+        now = time.monotonic()
+        self.value = value
+        self.loaded = now
+        self.expires = now + ttl
+        self.accessed = now
+        self.loader = loader
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class NamedCache:
+    def __init__(self, name, ttl, maxsize, refresh_ahead=None):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.refresh_ahead = refresh_ahead
+        self._data = OrderedDict()  # key -> _Entry
+        self._inflight = {}         # key -> _Flight
+        self._generation = 0        # bumped by invalidate() so stale flights don't write back
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.refreshes = 0
+
+    # --- PLAIN ACCESS ---
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry.value
+
+    def set(self, key, value, loader=None):
+        with self._lock:
+            self._store(key, value, loader)
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        now = time.monotonic()
+        if entry is None:
+            return None
+        if entry.expires <= now:
+            del self._data[key]
+            return None
+        entry.accessed = now
+        self._data.move_to_end(key)
+        return entry
+
+    def _store(self, key, value, loader):
+        self._data[key] = _Entry(value, self.ttl, loader)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    # --- SINGLE-FLIGHT LOADING ---
+    def get_or_load(self, key, loader):
+        with self._lock:
+            entry = self._live(key)
+            if entry is not None:
+                self.hits += 1
+                if self._refresh_due(entry) and key not in self._inflight:
+                    self._start_refresh(key, entry.loader or loader)
+                return entry.value
+            self.misses += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        return self._run(key, loader, flight, generation)
+
+    def _run(self, key, loader, flight, generation):
+        t0 = time.perf_counter()
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+        metrics.observe("cache_load_seconds", time.perf_counter() - t0, cache=self.name)
+        with self._lock:
+            self.loads += 1
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+            # None means the load failed: let the next call retry
+            if flight.error is None and flight.value is not None and generation == self._generation:
+                self._store(key, flight.value, loader)
+        flight.done.set()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    # --- REFRESH-AHEAD ---
+    def _refresh_due(self, entry):
+        return self.refresh_ahead is not None and time.monotonic() - entry.loaded >= self.refresh_ahead * self.ttl
+
+    def _start_refresh(self, key, loader):
+        # Caller holds the lock. Readers keep the current value; concurrent misses join this flight.
+        flight = self._inflight[key] = _Flight()
+        self.refreshes += 1
+        _background.submit(self._refresh, key, loader, flight, self._generation)
+
+    def _refresh(self, key, loader, flight, generation):
+        try:
+            self._run(key, loader, flight, generation)
+        except Exception as e:
+            # Keep serving the old value until it expires
+            metrics.failure("cache.refresh", e, cache=self.name)
+
+    def sweep(self):
+        """Refresh entries that are due and were read within the last TTL."""
+        now = time.monotonic()
+        with self._lock:
+            for key, entry in list(self._data.items()):
+                if (entry.loader is not None and key not in self._inflight
+                        and self._refresh_due(entry) and now - entry.accessed < self.ttl):
+                    self._start_refresh(key, entry.loader)
+
+    # --- INVALIDATION ---
+    def invalidate(self, key=None):
+        """Drop one entry, or the whole dataset when no key is given."""
+        with self._lock:
+            # Loads already in flight finish for their waiters but are not stored,
+            # and the next miss starts a fresh one
+            self._generation += 1
+            if key is None:
+                self._data.clear()
+                self._inflight.clear()
+            else:
+                self._data.pop(key, None)
+                self._inflight.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {"name": self.name, "entries": len(self), "maxsize": self.maxsize, "ttl": self.ttl,
+                "hits": self.hits, "misses": self.misses, "loads": self.loads,
+                "coalesced": self.coalesced, "refreshes": self.refreshes}
+
+
+def _refresh_loop():
+    while True:
+        time.sleep(REFRESH_POLL)
+        for cache in list(_registry.values()):
+            if cache.refresh_ahead is not None:
+                cache.sweep()
+
+
+def get_cache(name, ttl=3600, maxsize=128, refresh_ahead=None):
+    """The process-wide cache called `name`, created on first use."""
+    global _refresher
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = NamedCache(name, ttl, maxsize, refresh_ahead)
+        if refresh_ahead is not None and _refresher is None:
+            _refresher = threading.Thread(target=_refresh_loop, name="cache-refresh-ahead", daemon=True)
+            _refresher.start()
+        return _registry[name]
+
+
+def invalidate(name, key=None):
+    if name in _registry:
+        _registry[name].invalidate(key)
+
+
+def all_stats():
+    return [c.stats() for c in _registry.values()]
+
+
+def cached(name, ttl=3600, maxsize=128, refresh_ahead=None):
+    """Memoise a function into the named cache, keyed on its arguments.
+
+    The wrapper grows .invalidate(*args, **kwargs) (no args = the whole
+    dataset) and .cache for stats.
+    """
+    def decorator(fn):
+        cache = get_cache(name, ttl, maxsize, refresh_ahead)
+
+        def make_key(args, kwargs):
+            return args + tuple(sorted(kwargs.items()))
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return cache.get_or_load(make_key(args, kwargs), functools.partial(fn, *args, **kwargs))
+
+        def invalidate_entry(*args, **kwargs):
+            cache.invalidate(make_key(args, kwargs) if args or kwargs else None)
+
+        wrapper.invalidate = invalidate_entry
+        wrapper.cache = cache
+        return wrapper
+    return decorator
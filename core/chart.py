@@ -0,0 +1,70 @@
+from core.lazy import lazy
+
+np = lazy("numpy")
+pd = lazy("pandas")
+
+# --- CHART DOWNSAMPLING ---
+# A browser chart has a few hundred pixels of width; shipping 2,500 daily candles
+# for a 10-year view only costs serialisation time. Long ranges are aggregated
+# into weekly / monthly OHLC bars (exact highs and lows, unlike point-picking
+# downsamplers), and indicators are computed on the daily series first so the
+# aggregation never changes their values.
+
+MAX_CANDLES = 600  # 10 years of weekly bars still fit
+RULES = [("1D", None), ("1W", "W-FRI"), ("1M", "M"), ("1Q", "Q")]  # pandas Period frequencies
+
+# NaN-skipping reductions over each run of rows (same as resample's max/min/sum)
+# (ufunc names, so importing this module doesn't load numpy)
+_REDUCE = {"High": "fmax", "Low": "fmin", "Volume": "add"}
+
+
+def resample_ohlc(bars, rule):
+    """Daily OHLCV -> `rule` bars, each stamped with the last trading day it covers.
+
+    Rows are already in date order, so every period is one contiguous run and
+    a single reduceat per column does the aggregation.
+    """
+    bars = bars.dropna(subset=["Close"])
+    if bars.empty:
+        return bars
+    codes = bars.index.to_period(rule).asi8
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:] - 1, len(codes) - 1]
+
+    out = {}
+    for col in bars.columns:
+        values = bars[col].to_numpy(dtype=float)
+        if col in _REDUCE:
+            out[col] = getattr(np, _REDUCE[col]).reduceat(np.nan_to_num(values) if col == "Volume" else values, starts)
+        elif col == "Open":
+            out[col] = values[starts]
+        else:
+            out[col] = values[ends]
+    return pd.DataFrame(out, index=bars.index[ends])
+
+
+def pick_rule(n_bars, max_candles=MAX_CANDLES):
+    """Finest bar size that keeps `n_bars` daily bars under `max_candles`."""
+    per_bar = {"1D": 1, "1W": 5, "1M": 21, "1Q": 63}
+    for label, rule in RULES:
+        if n_bars / per_bar[label] <= max_candles:
+            return label, rule
+    return RULES[-1]
+
+
+def ema(close, span):
+    return close.ewm(span=span, adjust=False).mean()
+
+
+def downsample(bars, indicators=None, max_candles=MAX_CANDLES):
+    """(candles, indicators sampled at each candle's close, bar-size label).
+
+    `indicators` is a dict of daily Series; each is read at the last trading
+    day of every aggregated bar, i.e. the value the daily chart shows there.
+    """
+    indicators = indicators or {}
+    label, rule = pick_rule(len(bars), max_candles)
+    if rule is None:
+        return bars, indicators, label
+    candles = resample_ohlc(bars, rule)
+    return candles, {name: s.reindex(candles.index) for name, s in indicators.items()}, label
@@ -0,0 +1,147 @@
+import threading
+
+from core.lazy import lazy
+
+np = lazy("numpy")
+pd = lazy("pandas")
+
+# --- INCREMENTAL ROLLING CROSS-ASSET RISK ---
+# Running sums of returns and return cross-products over a fixed window. A new
+# bar adds its outer product and drops the oldest one: O(assets^2) per bar, no
+# matter how much history has been fed.
+
+TRADING_DAYS = 252
+
+
+class RollingCovariance:
+    """Rolling covariance / correlation / volatility / beta over the last `window` bars.
+
+    Feed aligned daily returns (one value per asset per bar; NaN counts as a
+    flat day). Every `resync` bars the sums are rebuilt from the ring buffer so
+    floating-point drift from add/subtract can't accumulate; that costs
+    O(window * assets^2) once per `resync` bars, i.e. O(assets^2) amortised.
+
+    One engine is shared by every dashboard session, so updates and readouts
+    all hold the engine's lock.
+    """
+
+    def __init__(self, symbols, window=60, resync=None):
+        self.symbols = list(symbols)
+        self.window = window
+        self.resync = resync or window
+        n = len(self.symbols)
+        self._buf = np.zeros((window, n))
+        self._pos = 0         # next ring slot to write
+        self.count = 0        # bars currently inside the window
+        self._since_sync = 0
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._scratch = np.empty((n, n))  # reused so a bar allocates no n x n temporaries
+        self.last_date = None
+        self._lock = threading.RLock()
+
+    # --- UPDATES ---
+    def update(self, returns, date=None):
+        with self._lock:
+            self._update(returns, date)
+
+    def _update(self, returns, date):
+        r = np.nan_to_num(np.asarray(returns, dtype=float))
+        if self.count == self.window:
+            old = self._buf[self._pos]
+            self._cross -= np.multiply(old[:, None], old, out=self._scratch)
+            self._sum -= old
+        else:
+            self.count += 1
+        self._cross += np.multiply(r[:, None], r, out=self._scratch)
+        self._sum += r
+        self._buf[self._pos] = r
+        self._pos = (self._pos + 1) % self.window
+        if date is not None:
+            self.last_date = date
+
+        self._since_sync += 1
+        if self._since_sync >= self.resync:
+            self._resync()
+
+    def revise(self, returns):
+        """Replace the most recently fed bar, e.g. when a partial last bar is re-fetched."""
+        with self._lock:
+            if self.count == 0:
+                return self._update(returns, None)
+            r = np.nan_to_num(np.asarray(returns, dtype=float))
+            slot = (self._pos - 1) % self.window
+            old = self._buf[slot]
+            self._cross -= np.multiply(old[:, None], old, out=self._scratch)
+            self._sum -= old
+            self._cross += np.multiply(r[:, None], r, out=self._scratch)
+            self._sum += r
+            self._buf[slot] = r
+
+    def _resync(self):
+        live = self._buf if self.count == self.window else self._buf[:self.count]
+        self._sum = live.sum(axis=0)
+        self._cross = live.T @ live
+        self._since_sync = 0
+
+    def update_from_closes(self, close):
+        """Feed every bar in a wide Close frame that is newer than the last one seen.
+
+        Returns are taken on business days: weekend rows only exist because
+        crypto trades them, and would be flat days for every other asset. The
+        last bar seen is re-fed in place, since the store re-requests it as it
+        is often an intraday partial.
+        """
+        if close.empty:  # an empty download has no date index to align on
+            return 0
+        close = close.reindex(columns=self.symbols).sort_index().ffill()
+        close = close[close.index.dayofweek < 5]
+        rets = close.pct_change(fill_method=None)
+        with self._lock:
+            if self.last_date is not None:
+                if self.last_date in rets.index:
+                    self.revise(rets.loc[self.last_date].to_numpy())
+                rets = rets.loc[rets.index > self.last_date]
+            else:
+                rets = rets.iloc[1:]
+            # Only the last `window` bars can survive, so skip the rest on a cold start
+            for date, row in zip(rets.index[-self.window:], rets.to_numpy()[-self.window:]):
+                self._update(row, date)
+            if len(rets.index):
+                self.last_date = rets.index[-1]
+            return len(rets.index)
+
+    @classmethod
+    def from_closes(cls, close, window=60):
+        engine = cls(close.columns, window)
+        engine.update_from_closes(close)
+        return engine
+
+    # --- READOUTS ---
+    def cov(self):
+        with self._lock:
+            k = self.count
+            if k < 2:
+                return np.full((len(self.symbols),) * 2, np.nan)
+            out = np.multiply(self._sum[:, None], self._sum / k)
+            np.subtract(self._cross, out, out=out)
+            out /= k - 1
+            return out
+
+    def corr(self):
+        c = self.cov()
+        sd = np.sqrt(np.clip(np.diag(c), 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = c / np.outer(sd, sd)
+        np.fill_diagonal(out, 1.0)
+        return pd.DataFrame(np.clip(out, -1, 1), index=self.symbols, columns=self.symbols)
+
+    def vol(self):
+        """Annualised volatility per asset."""
+        return pd.Series(np.sqrt(np.clip(np.diag(self.cov()), 0, None) * TRADING_DAYS), index=self.symbols)
+
+    def beta(self, benchmark):
+        c = self.cov()
+        b = self.symbols.index(benchmark)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.Series(c[:, b] / c[b, b], index=self.symbols)
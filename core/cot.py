@@ -0,0 +1,326 @@
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from core import metrics, providers
+from core.cache import cached
+from core.lazy import lazy
+
+pd = lazy("pandas")
+requests = lazy("requests")
+
+# --- CFTC COT ARCHIVE CACHE ---
+# Each deacot{year}.zip is parsed once and kept as Parquet under data/cot/.
+# Closed years are never fetched again; the open year is revalidated with a
+# conditional request (ETag / Last-Modified) so an unchanged file costs a 304.
+
+URL = "https://www.cftc.gov/files/dea/history/deacot{year}.zip"
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cot")
+NUM_COLS = ['NC_Long', 'NC_Short', 'C_Long', 'C_Short', 'NR_Long', 'NR_Short']
+NET_COLS = ['Net_NC', 'Net_C', 'Net_NR']
+POSITIONING_WINDOW = 52  # weeks
+MIN_WEEKS = 13
+SCHEMA = 2  # bump when resolve_schema changes: years parsed under an older mapping are re-parsed
+
+_meta_lock = threading.Lock()
+
+
+def find_col(columns, keywords, excludes=None):
+    for col in columns:
+        c = str(col).lower().replace("_", " ").strip()
+        if all(k.lower() in c for k in keywords):
+            if excludes and any(e.lower() in c for e in excludes): continue
+            return col
+    return None
+
+
+def resolve_schema(columns):
+    """Map our names onto a yearly file's header. Needs only the header row."""
+    c_map = {
+        'Market': find_col(columns, ["market", "name"]),
+        'DateRaw': find_col(columns, ["date"]),
+        'NC_Long': find_col(columns, ["noncomm", "long"], excludes=["old", "other"]),
+        'NC_Short': find_col(columns, ["noncomm", "short"], excludes=["old", "other"]),
+        'C_Long': find_col(columns, ["comm", "long"], excludes=["non", "old"]),
+        'C_Short': find_col(columns, ["comm", "short"], excludes=["non", "old"]),
+        # Legacy header "Nonreportable Positions-Long (All)"; newer files abbreviate to "NonRept"
+        'NR_Long': find_col(columns, ["nonreport", "long"], excludes=["old", "other"])
+                   or find_col(columns, ["nonrept", "long"], excludes=["old", "other"]),
+        'NR_Short': find_col(columns, ["nonreport", "short"], excludes=["old", "other"])
+                    or find_col(columns, ["nonrept", "short"], excludes=["old", "other"]),
+    }
+    return {k: v for k, v in c_map.items() if v is not None}
+
+
+def typed(df):
+    """Compact in-memory layout: categorical Market, int32 positions, no raw date text."""
+    df = df.drop(columns=['DateRaw'], errors='ignore')
+    if 'Market' in df.columns and df['Market'].dtype != 'category':
+        df['Market'] = df['Market'].astype('category')
+    for col in NUM_COLS:
+        if col in df.columns and df[col].dtype != 'int32':
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int32')
+    return df
+
+
+def parse_year(content):
+    """Raw deacot zip bytes -> the columns we use, or None if unrecognised."""
+    z = zipfile.ZipFile(io.BytesIO(content))
+    name = z.namelist()[0]
+
+    # 1. Schema from the header row only
+    header = pd.read_csv(z.open(name), nrows=0).columns
+    found = resolve_schema(header)
+    if len(found) < 4:
+        return None
+
+    # 2. Projected parse: only the needed columns, with narrow dtypes up front
+    narrow = dict({k: 'Int32' for k in NUM_COLS}, Market='category', DateRaw=str)
+    dtypes = {col: narrow[k] for k, col in found.items()}
+    cols = list(found.values())
+    try:
+        # pyarrow's multithreaded reader still has to tokenise every line, but is ~2x the C engine here
+        df_year = pd.read_csv(z.open(name), usecols=cols, dtype=dtypes, engine="pyarrow")
+    except (ImportError, ValueError):
+        # No pyarrow, or a stray non-numeric cell: read as text and let typed() coerce
+        df_year = pd.read_csv(z.open(name), usecols=cols, dtype=str)
+    df_year = df_year.rename(columns={v: k for k, v in found.items()})[list(found)]
+
+    if 'DateRaw' in df_year.columns:
+        df_year['Date'] = pd.to_datetime(df_year['DateRaw'], format='%y%m%d', errors='coerce')
+    return typed(df_year)
+
+
+class CotCache:
+    def __init__(self, root=DEFAULT_ROOT, session=None):
+        self.root = root
+        self.session = session or providers.current().session()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, year):
+        return os.path.join(self.root, f"{year}.parquet")
+
+    def _meta_path(self):
+        return os.path.join(self.root, "_meta.json")
+
+    def meta(self):
+        try:
+            with open(self._meta_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self, year, entry):
+        with _meta_lock:
+            meta = self.meta()
+            meta[str(year)] = entry
+            tmp = self._meta_path() + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, self._meta_path())
+
+    @staticmethod
+    def is_closed(year, fetched_at):
+        # The final report of a year is published in early January, so a year
+        # only counts as closed once our copy was taken after January of year+1
+        return fetched_at >= datetime(year + 1, 2, 1).timestamp()
+
+    def load_year(self, year):
+        entry = self.meta().get(str(year))
+        cached = entry is not None and entry.get("schema") == SCHEMA and os.path.exists(self._path(year))
+        if cached and self.is_closed(year, entry["fetched"]):
+            metrics.inc("cot_year_total", source="disk")
+            return typed(pd.read_parquet(self._path(year)))
+
+        headers = {}
+        if cached:
+            if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            with metrics.timer("cot_download_seconds"):
+                r = self.session.get(URL.format(year=year), headers=headers, timeout=30)
+        except requests.RequestException as e:
+            # Offline: fall back to whatever we have on disk
+            metrics.failure("cot.download", e, year=year)
+            return typed(pd.read_parquet(self._path(year))) if cached else None
+
+        if r.status_code == 304 and cached:
+            metrics.inc("cot_year_total", source="not_modified")
+            self._save_meta(year, dict(entry, fetched=time.time()))
+            return typed(pd.read_parquet(self._path(year)))
+        if r.status_code != 200:
+            metrics.failure("cot.download", f"HTTP {r.status_code}", year=year)
+            return typed(pd.read_parquet(self._path(year))) if cached else None
+
+        try:
+            with metrics.timer("cot_parse_seconds"):
+                df_year = parse_year(r.content)
+            if df_year is None:
+                metrics.failure("cot.parse", "UNKNOWN_SCHEMA", year=year)
+        except (zipfile.BadZipFile, ValueError, pd.errors.ParserError) as e:
+            metrics.failure("cot.parse", e, year=year)
+            df_year = None
+        if df_year is None:
+            return typed(pd.read_parquet(self._path(year))) if cached else None
+        tmp = self._path(year) + f".{threading.get_ident()}.tmp"
+        df_year.to_parquet(tmp)
+        os.replace(tmp, self._path(year))
+        metrics.inc("cot_year_total", source="download")
+        self._save_meta(year, {
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "fetched": time.time(),
+            "schema": SCHEMA,
+        })
+        return df_year
+
+    def load(self, years_back, max_workers=8, load_year=None):
+        current_year = datetime.now().year
+        years = range(current_year - years_back, current_year + 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            frames = [df for df in ex.map(load_year or self.load_year, years) if df is not None]
+        return combine(frames)
+
+
+def combine(all_data):
+    if not all_data: return pd.DataFrame()
+    # Share one category set across years so concat keeps Market categorical
+    markets = pd.api.types.union_categoricals([df['Market'] for df in all_data]).categories
+    all_data = [df.assign(Market=df['Market'].cat.set_categories(markets)) for df in all_data]
+    full_df = pd.concat(all_data, ignore_index=True).sort_values(by='Date').drop_duplicates()
+
+    # Explicit calculations for all 3 groups
+    full_df['Net_NC'] = full_df.get('NC_Long', 0) - full_df.get('NC_Short', 0) # Smart Money
+    full_df['Net_C'] = full_df.get('C_Long', 0) - full_df.get('C_Short', 0)   # Hedgers
+    full_df['Net_NR'] = full_df.get('NR_Long', 0) - full_df.get('NR_Short', 0) # Retail
+
+    return full_df.dropna(subset=['Date'])
+
+
+def add_positioning(full_df, window=POSITIONING_WINDOW, min_weeks=MIN_WEEKS):
+    """Rolling positioning analytics for every market in one groupby/rolling pass.
+
+    Adds, for each of Net_NC / Net_C / Net_NR: rolling mean and std (the chart
+    bands), z-score, percentile rank within the window, and week-over-week change.
+    """
+    if full_df.empty:
+        return full_df
+    df = full_df.sort_values(['Market', 'Date'], kind='stable')
+    g = df.groupby('Market', observed=True, sort=False)
+    for col in NET_COLS:
+        if col not in df.columns:
+            continue
+        roll = g[col].rolling(window, min_periods=min_weeks)
+        mean = roll.mean().reset_index(level=0, drop=True)
+        std = roll.std().reset_index(level=0, drop=True)
+        pct = roll.rank(pct=True).reset_index(level=0, drop=True)
+        df[f'{col}_Mean'] = mean.astype('float32')
+        df[f'{col}_Std'] = std.astype('float32')
+        df[f'{col}_Z'] = ((df[col] - mean) / std.where(std > 0)).astype('float32')
+        df[f'{col}_Pct'] = (pct * 100).astype('float32')
+        df[f'{col}_WoW'] = g[col].diff().astype('float32')
+    return df.sort_values('Date', kind='stable')
+
+
+class CotIndex:
+    """The combined COT frame partitioned once into {market: date-sorted slice}.
+
+    Lookups resolve a cot_map name against the market list (cached per name)
+    and cut the lookback with a binary search instead of masking every row.
+    """
+
+    def __init__(self, full_df):
+        self.frame = full_df
+        self._slices = {}
+        self._dates = {}
+        self._resolved = {}
+        if full_df.empty:
+            return
+        for market, grp in full_df.groupby('Market', observed=True, sort=False):
+            grp = grp.sort_values('Date', kind='stable')
+            self._slices[market] = grp
+            self._dates[market] = grp['Date'].to_numpy()
+        # Latest report per market, for cross-market screens
+        self.latest = pd.concat([grp.iloc[-1:] for grp in self._slices.values()], ignore_index=True)
+
+    @property
+    def empty(self):
+        return not self._slices
+
+    @property
+    def markets(self):
+        return list(self._slices)
+
+    def resolve(self, cot_name):
+        """Exact CFTC name if present, else the old prefix match (e.g. after a rename)."""
+        if cot_name not in self._resolved:
+            exact = [m for m in self._slices if m.lower() == cot_name.lower()]
+            if exact:
+                self._resolved[cot_name] = exact
+            else:
+                asset_key = cot_name.split("-")[0].strip().lower()
+                self._resolved[cot_name] = [m for m in self._slices if asset_key in m.lower()]
+        return self._resolved[cot_name]
+
+    def history(self, cot_name):
+        markets = self.resolve(cot_name)
+        if len(markets) == 1:
+            return self._slices[markets[0]]
+        if not markets:
+            return self.frame.iloc[0:0]
+        return pd.concat([self._slices[m] for m in markets]).sort_values('Date', kind='stable')
+
+    def since(self, cot_name, cutoff):
+        """Rows for one market from `cutoff` on: a searchsorted slice, no boolean mask."""
+        markets = self.resolve(cot_name)
+        if len(markets) == 1:
+            m = markets[0]
+            start = self._dates[m].searchsorted(pd.Timestamp(cutoff).to_datetime64())
+            return self._slices[m].iloc[start:]
+        hist = self.history(cot_name)
+        return hist.iloc[hist['Date'].searchsorted(pd.Timestamp(cutoff)):]
+
+    def extremes(self, col='Net_NC', n=15, max_age_days=21):
+        """Markets ranked by |rolling z-score| of `col` on their latest report.
+
+        Markets whose last report is older than `max_age_days` (delisted or
+        renamed contracts) are left out.
+        """
+        latest = self.latest
+        z = f'{col}_Z'
+        if latest.empty or z not in latest.columns:
+            return latest
+        fresh = latest[latest['Date'] >= latest['Date'].max() - pd.Timedelta(days=max_age_days)]
+        fresh = fresh.dropna(subset=[z])
+        return fresh.iloc[fresh[z].abs().to_numpy().argsort()[::-1][:n]]
+
+
+_default = None
+
+
+def default_cache():
+    global _default
+    if _default is None:
+        _default = CotCache()
+    return _default
+
+
+@cached("cot_year", ttl=86400, maxsize=16)
+def cot_year(year):
+    # Parsed yearly frames stay in memory; refreshing COT only drops the open year
+    return default_cache().load_year(year)
+
+
+def load_cot(years_back):
+    # Positioning analytics are computed here, once per load, and travel with the frame
+    return add_positioning(default_cache().load(years_back, load_year=cot_year))
+
+
+def refresh_current_year():
+    cot_year.invalidate(datetime.now().year)
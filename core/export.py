@@ -0,0 +1,130 @@
+import csv
+import os
+
+from core.lazy import lazy
+
+pd = lazy("pandas")
+pa = lazy("pyarrow")
+ds = lazy("pyarrow.dataset")
+feather = lazy("pyarrow.feather")
+pq = lazy("pyarrow.parquet")
+
+# --- REPORT EXPORT ---
+# Scan results stay numeric all the way through: rows stream to a columnar (or
+# CSV) file as they arrive, each day's table is filed into a date-partitioned
+# Arrow history, and strings like "4.25%" only exist in the final render.
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "history")
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+
+class ReportWriter:
+    """Append result rows to `path` while a scan runs.
+
+    Rows are buffered and flushed every `batch_size` rows, so a crash loses
+    at most one batch and a large universe never sits in memory as strings.
+    The schema is fixed by the first flush; CSV output takes its header from
+    the first row and never touches pyarrow.
+    """
+
+    def __init__(self, path, fmt="parquet", batch_size=64):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.rows = 0
+        self._buffer = []
+        self._schema = None
+        self._columns = None
+        self._writer = None
+        self._file = None
+
+    def write(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self.fmt == "csv":
+            if self._columns is None:
+                self._columns = list(self._buffer[0])
+                self._open()
+            self._writer.writerows([[r.get(c) for c in self._columns] for r in self._buffer])
+            self._file.flush()
+        else:
+            table = pa.Table.from_pylist(self._buffer, schema=self._schema)
+            if self._schema is None:
+                self._schema = table.schema
+                self._open()
+            self._writer.write_table(table)
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def _open(self):
+        if self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        elif self.fmt == "arrow":
+            self._file = pa.OSFile(self.path, "wb")
+            self._writer = pa.ipc.new_file(self._file, self._schema)
+        else:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self._columns)
+
+    def close(self):
+        self.flush()
+        if self.fmt != "csv" and self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def report_path(name, fmt="parquet", date=None):
+    """'Deep_Scan' -> 'Deep_Scan_YYYYMMDD.parquet'."""
+    stamp = pd.Timestamp(date or pd.Timestamp.today()).strftime('%Y%m%d')
+    return f"{name}_{stamp}{FORMATS[fmt]}"
+
+
+# --- DATED HISTORY ---
+def append_history(df, name, date=None, root=DEFAULT_HISTORY):
+    """File one day's scan under <root>/<name>/date=YYYY-MM-DD/ as an uncompressed
+    Arrow file. Rerunning on the same day replaces that day's partition."""
+    day = pd.Timestamp(date or pd.Timestamp.today()).strftime('%Y-%m-%d')
+    part = os.path.join(root, name, f"date={day}")
+    os.makedirs(part, exist_ok=True)
+    path = os.path.join(part, "part-0.arrow")
+    # Uncompressed so readers can memory-map the columns instead of decoding them
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), path, compression="uncompressed")
+    return path
+
+
+def history_dataset(name, root=DEFAULT_HISTORY):
+    """Every filed day of `name` as one pyarrow Dataset, partitioned by date."""
+    return ds.dataset(os.path.join(root, name), format="arrow", partitioning="hive")
+
+
+def read_history(name, since=None, root=DEFAULT_HISTORY):
+    dataset = history_dataset(name, root)
+    flt = ds.field("date") >= pd.Timestamp(since).strftime('%Y-%m-%d') if since is not None else None
+    return dataset.to_table(filter=flt).to_pandas()
+
+
+# --- FINAL RENDER ---
+def render(df, percent=(), decimals=None):
+    """String view for the console / Excel: `percent` columns as '1.23%',
+    `decimals` maps other columns to a rounding. The input frame is untouched."""
+    out = df.copy()
+    for col in percent:
+        out[col] = out[col].map(lambda x: f"{x:.2f}%" if pd.notna(x) else "")
+    for col, places in (decimals or {}).items():
+        out[col] = out[col].round(places)
+    return out
@@ -0,0 +1,42 @@
+import importlib
+import sys
+import threading
+import types
+
+# --- DEFERRED IMPORTS ---
+# pandas, numpy, pyarrow, requests and plotly cost most of a CLI's start-up.
+# Core modules bind them through lazy() so importing the module is cheap and
+# the library loads on first attribute access, i.e. only on paths that use it.
+
+_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module the first time it is touched.
+
+    After the first access the real module's namespace is copied in, so later
+    lookups are plain attribute reads with no __getattr__ round trip.
+    """
+
+    def __getattr__(self, attr):
+        with _lock:
+            if "__file__" not in self.__dict__:
+                module = importlib.import_module(self.__name__)
+                self.__dict__.update(module.__dict__)
+        try:
+            return self.__dict__[attr]
+        except KeyError:
+            # Submodules (pd.api, pd.errors...) that the package does not bind eagerly
+            try:
+                return importlib.import_module(f"{self.__name__}.{attr}")
+            except ModuleNotFoundError:
+                raise AttributeError(f"module '{self.__name__}' has no attribute '{attr}'") from None
+
+    def __repr__(self):
+        state = "loaded" if "__file__" in self.__dict__ else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy(name):
+    """The real module if it is already imported, else a LazyModule for it."""
+    return sys.modules.get(name) or LazyModule(name)
@@ -0,0 +1,155 @@
+import json
+import os
+import sqlite3
+import threading
+
+from core.lazy import lazy
+
+pd = lazy("pandas")
+
+# --- ALPHA VANTAGE QUOTA LEDGER & RESPONSE CACHE ---
+# One SQLite file that outlives the process: calls and limit replies per key per
+# day, so a new run knows which keys are spent before it sends anything, and the
+# raw JSON of every good reply keyed by (function, symbol, data date), so a
+# rerun on the same day is answered locally.
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "alpha_vantage.sqlite")
+MARKET_TZ = "America/New_York"
+MARKET_CLOSE_HOUR = 16
+UNSERVED = ("SYSTEM_ERROR",)  # network failures / timeouts: the request never reached AV
+SESSION_FUNCTIONS = ("TIME_SERIES_DAILY",)  # series that only change at the US-equity close
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota (
+    api_key   TEXT NOT NULL,
+    day       TEXT NOT NULL,
+    calls     INTEGER NOT NULL DEFAULT 0,
+    limits    INTEGER NOT NULL DEFAULT 0,
+    exhausted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (api_key, day)
+);
+CREATE TABLE IF NOT EXISTS responses (
+    function     TEXT NOT NULL,
+    symbol       TEXT NOT NULL,
+    trading_date TEXT NOT NULL,
+    fetched      TEXT NOT NULL,
+    body         TEXT NOT NULL,
+    PRIMARY KEY (function, symbol, trading_date)
+);
+"""
+
+
+def quota_day(now=None):
+    """Calendar day the free-tier daily quota is counted against (US/Eastern)."""
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz=MARKET_TZ)
+    if now.tzinfo is not None:
+        now = now.tz_convert(MARKET_TZ)
+    return str(now.date())
+
+
+def trading_date(now=None):
+    """Last session whose close a daily series can contain: before the close or
+    on a weekend that is the previous weekday."""
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz=MARKET_TZ)
+    if now.tzinfo is not None:
+        now = now.tz_convert(MARKET_TZ)
+    day = now.normalize().tz_localize(None)
+    if now.hour < MARKET_CLOSE_HOUR:
+        day -= pd.Timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= pd.Timedelta(days=1)
+    return str(day.date())
+
+
+def data_date(function, now=None):
+    """Date a cached reply of `function` stays valid for.
+
+    Equity series follow the 16:00 ET session (trading_date). Crypto trades
+    every day and FX_DAILY carries the in-progress day, so those are keyed
+    by the UTC calendar date instead.
+    """
+    if function in SESSION_FUNCTIONS:
+        return trading_date(now)
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz="UTC")
+    if now.tzinfo is not None:
+        now = now.tz_convert("UTC")
+    return str(now.date())
+
+
+def request_key(params):
+    """(function, symbol) identifying a daily-series request, whatever the endpoint."""
+    symbol = params.get("symbol") or params.get("from_symbol")
+    return params["function"], symbol
+
+
+class ApiLedger:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One connection shared by the fetch threads, serialised by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    # --- QUOTA ---
+    def record(self, api_key, status, day=None):
+        """Count one request sent with `api_key` and what came back.
+
+        Only replies AV actually served spend quota; a transport error is not counted.
+        """
+        if status in UNSERVED:
+            return
+        limit = status in ("LIMIT_HIT", "DAILY_LIMIT")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO quota (api_key, day, calls, limits, exhausted) VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT (api_key, day) DO UPDATE SET calls = calls + 1, "
+                "limits = limits + excluded.limits, exhausted = MAX(exhausted, excluded.exhausted)",
+                (api_key, day or quota_day(), int(limit), int(status == "DAILY_LIMIT")),
+            )
+
+    def usage(self, day=None):
+        """{key: {"calls", "limits", "exhausted"}} for every key used on `day`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT api_key, calls, limits, exhausted FROM quota WHERE day = ?", (day or quota_day(),)
+            ).fetchall()
+        return {k: {"calls": c, "limits": l, "exhausted": bool(x)} for k, c, l, x in rows}
+
+    # --- RESPONSES ---
+    def response(self, params, date=None):
+        function, symbol = request_key(params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM responses WHERE function = ? AND symbol = ? AND trading_date = ?",
+                (function, symbol, date or data_date(function)),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_response(self, params, data, date=None):
+        function, symbol = request_key(params)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (function, symbol, date or data_date(function), pd.Timestamp.now(tz="UTC").isoformat(), json.dumps(data)),
+            )
+
+    def prune(self, keep_days=7):
+        """Drop quota rows and cached responses older than `keep_days`."""
+        cutoff = str((pd.Timestamp.now(tz=MARKET_TZ) - pd.Timedelta(days=keep_days)).date())
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM quota WHERE day < ?", (cutoff,))
+            self._conn.execute("DELETE FROM responses WHERE trading_date < ?", (cutoff,))
+
+    def close(self):
+        self._conn.close()
+
+
+_default = None
+
+
+def default_ledger():
+    global _default
+    if _default is None:
+        _default = ApiLedger()
+    return _default
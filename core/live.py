@@ -0,0 +1,247 @@
+import os
+import threading
+import time
+from collections import deque
+
+from core.lazy import lazy
+from core.market_data import FIELDS, fetch_history
+from core.momentum import classify, momentum
+
+np = lazy("numpy")
+pd = lazy("pandas")
+
+# --- LIVE INTRADAY MODE ---
+# Ticks / intraday bars from a pluggable feed are folded into 1m / 5m / 1h / 1D
+# OHLC with O(1) work per update: each timeframe keeps one open bar per symbol
+# and a bounded deque of closed ones. Consumers ask for what changed since
+# their last cursor, so a refresh only touches the symbols that moved.
+
+TIMEFRAMES = {"1m": 60, "5m": 300, "1h": 3600, "1D": 86400}
+MAX_BARS = 2000  # closed bars kept per symbol and timeframe
+
+
+class BarAggregator:
+    def __init__(self, timeframes=TIMEFRAMES, max_bars=MAX_BARS):
+        self.timeframes = dict(timeframes)
+        self.max_bars = max_bars
+        self._open = {}    # (symbol, tf) -> [start, o, h, l, c, v]
+        self._closed = {}  # (symbol, tf) -> deque of closed bars
+        self.late = 0      # updates older than the open bar, dropped
+
+    def update(self, symbol, ts, open_, high, low, close, volume=0.0):
+        """Fold one bar (or a tick: open = high = low = close) stamped `ts` (epoch seconds)."""
+        for tf, seconds in self.timeframes.items():
+            start = ts - ts % seconds
+            key = (symbol, tf)
+            bar = self._open.get(key)
+            if bar is None or start > bar[0]:
+                if bar is not None:
+                    closed = self._closed.get(key)
+                    if closed is None:
+                        closed = self._closed[key] = deque(maxlen=self.max_bars)
+                    closed.append(tuple(bar))
+                self._open[key] = [start, open_, high, low, close, volume]
+            elif start == bar[0]:
+                if high > bar[2]: bar[2] = high
+                if low < bar[3]: bar[3] = low
+                bar[4] = close
+                bar[5] += volume
+            else:
+                self.late += 1
+
+    def tick(self, symbol, ts, price, volume=0.0):
+        self.update(symbol, ts, price, price, price, price, volume)
+
+    def bars(self, symbol, tf):
+        """Closed bars plus the open one as an OHLCV frame (UTC index)."""
+        rows = list(self._closed.get((symbol, tf), ()))
+        if (symbol, tf) in self._open:
+            rows.append(tuple(self._open[(symbol, tf)]))
+        if not rows:
+            return pd.DataFrame(columns=FIELDS)
+        arr = np.array(rows, dtype=float)
+        return pd.DataFrame(arr[:, 1:], columns=FIELDS, index=pd.to_datetime(arr[:, 0], unit="s", utc=True))
+
+    def last(self, symbol):
+        bar = self._open.get((symbol, "1m")) or next(
+            (b for (s, _), b in self._open.items() if s == symbol), None)
+        return None if bar is None else bar[4]
+
+
+# --- FEEDS ---
+class Feed:
+    """Source of intraday updates: poll() -> iterable of (symbol, ts, o, h, l, c, v)."""
+
+    def poll(self):
+        raise NotImplementedError
+
+
+def _bar_rows(frame, since=None):
+    """Wide (field, symbol) intraday frame -> update tuples, oldest first."""
+    out = []
+    index = frame.index if frame.index.tz is None else frame.index.tz_convert("UTC").tz_localize(None)
+    stamps = index.as_unit("s").asi8  # naive stamps are taken as UTC
+    for sym in frame.columns.get_level_values(1).unique():
+        cols = frame.xs(sym, axis=1, level=1).reindex(columns=FIELDS).to_numpy(dtype=float)
+        for ts, (o, h, l, c, v) in zip(stamps, cols):
+            if np.isnan(c) or (since is not None and ts < since.get(sym, -1)):
+                continue
+            out.append((sym, int(ts), o, h, l, c, 0.0 if np.isnan(v) else v))
+    out.sort(key=lambda r: r[1])
+    return out
+
+
+class ReplayFeed(Feed):
+    """Steps through a recorded intraday frame, `rows_per_poll` timestamps at a time."""
+
+    def __init__(self, frame, rows_per_poll=1):
+        self.frame = frame.sort_index()
+        self.rows_per_poll = rows_per_poll
+        self.pos = 0
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(pd.read_parquet(path), **kwargs)
+
+    @classmethod
+    def from_provider(cls, symbols, period="5d", interval="1m", **kwargs):
+        return cls(fetch_history(symbols, period=period, interval=interval), **kwargs)
+
+    @property
+    def done(self):
+        return self.pos >= len(self.frame.index)
+
+    def poll(self):
+        chunk = self.frame.iloc[self.pos:self.pos + self.rows_per_poll]
+        self.pos += len(chunk.index)
+        return _bar_rows(chunk) if len(chunk.index) else []
+
+
+class PollingFeed(Feed):
+    """Today's 1-minute bars from the current provider, at most one download per `every` seconds.
+
+    Each poll re-sends every symbol's newest bar (it may still be filling) plus
+    any bars not sent before; the aggregator folds repeats into the same bucket.
+    Only the still-open bar is resent, so volume is never counted twice.
+    """
+
+    def __init__(self, symbols, every=30):
+        self.symbols = list(symbols)
+        self.every = every
+        self._last_poll = 0.0
+        self._sent = {}  # symbol -> start of the newest bar already sent as complete
+
+    def poll(self):
+        if time.monotonic() - self._last_poll < self.every:
+            return []
+        self._last_poll = time.monotonic()
+        frame = fetch_history(self.symbols, period="1d", interval="1m")
+        if frame.empty:
+            return []
+        rows = _bar_rows(frame, since={s: t + 1 for s, t in self._sent.items()})
+        newest = {}
+        for sym, ts, *_ in rows:
+            newest[sym] = max(ts, newest.get(sym, ts))
+        out = []
+        for row in rows:
+            sym, ts = row[0], row[1]
+            if ts < newest[sym]:
+                out.append(row)
+                self._sent[sym] = max(ts, self._sent.get(sym, ts))
+            else:
+                out.append(row[:6] + (0.0,))  # open bar: price only until it closes
+        return out
+
+
+def make_feed(symbols):
+    """QT_LIVE_FEED=replay:<parquet> replays a recorded 1m frame; otherwise poll the provider."""
+    spec = os.environ.get("QT_LIVE_FEED", "")
+    if spec.startswith("replay:"):
+        return ReplayFeed.from_file(spec.split(":", 1)[1])
+    return PollingFeed(symbols)
+
+
+# --- ENGINE ---
+class LiveEngine:
+    """Feed + aggregator shared by every session, with a change log per symbol."""
+
+    def __init__(self, feed, timeframes=TIMEFRAMES):
+        self.feed = feed
+        self.bars = BarAggregator(timeframes)
+        self.seq = 0
+        self._changed = {}  # symbol -> seq of its latest update
+        self._lock = threading.Lock()
+
+    def pump(self):
+        """Pull whatever the feed has; returns how many updates were folded in."""
+        with self._lock:
+            updates = list(self.feed.poll())
+            for sym, ts, o, h, l, c, v in updates:
+                self.bars.update(sym, ts, o, h, l, c, v)
+                self.seq += 1
+                self._changed[sym] = self.seq
+            return len(updates)
+
+    def changes_since(self, cursor):
+        """({symbol: last price} for symbols updated after `cursor`, new cursor)."""
+        with self._lock:
+            moved = {s: self.bars.last(s) for s, q in self._changed.items() if q > cursor}
+            return moved, self.seq
+
+    def history(self, symbol, tf):
+        with self._lock:
+            return self.bars.bars(symbol, tf)
+
+
+class LiveRanking:
+    """Momentum ranking over daily closes with today's bar replaced by the live price.
+
+    Reference prices are fixed once per (matrix, lookback, short), so each live
+    update recomputes one row in O(1) instead of rebuilding the matrix. Until
+    a row gets its first live price it shows exactly what momentum_frame shows.
+    """
+
+    def __init__(self, pm, lookback, short, today=None):
+        today = np.datetime64(pd.Timestamp(today or pd.Timestamp.today()).normalize().tz_localize(None), "D")
+        width = pm.values.shape[1] if pm.values.size else 0
+        # If the last stored bar is today's, the live price replaces it; else it becomes a new bar
+        self.replace = pm.dates.astype("datetime64[D]") >= today if len(pm.symbols) else np.zeros(0, bool)
+        shift = np.where(self.replace, 0, 1)
+        self.index = {s: i for i, s in enumerate(pm.symbols)}
+        # Bar counts once a live price lands: one more bar where it opens a new day
+        self._live_counts = pm.counts + shift
+        self.counts = pm.counts.copy()
+        self.last = pm.last.copy()
+        self.ref = {}
+        for name, n in (("long", lookback), ("short", short)):
+            pos = np.clip(n - shift, 1, max(width, 1))
+            ref = pm.values[np.arange(len(pm.symbols)), -pos] if width else np.empty(0)
+            # Same rule as momentum(): too little history for the lookback -> NaN
+            self.ref[name] = np.where(self._live_counts >= n, ref, np.nan)
+        self.lookback, self.short = lookback, short
+        self.symbols = list(pm.symbols)
+        # Rows without a live price yet keep the stored ranking; the shifted
+        # references only apply from a row's first live price
+        mom = momentum(pm, [lookback, short])
+        self.mom, self.mom_short = mom[:, 0].copy(), mom[:, 1].copy()
+        self.cursor = 0
+
+    def update(self, prices):
+        """Apply {symbol: live price}; returns the symbols whose row changed."""
+        changed = []
+        for sym, price in prices.items():
+            i = self.index.get(sym)
+            if i is None or price is None:
+                continue
+            self.last[i] = price
+            self.counts[i] = self._live_counts[i]
+            self.mom[i] = (price - self.ref["long"][i]) / self.ref["long"][i] * 100
+            self.mom_short[i] = (price - self.ref["short"][i]) / self.ref["short"][i] * 100
+            changed.append(sym)
+        return changed
+
+    def frame(self, min_bars=25):
+        state, trend = classify(self.mom, self.mom_short)
+        out = pd.DataFrame({"Symbol": self.symbols, "Last": self.last, "Momentum": self.mom,
+                            "Short Momentum": self.mom_short, "Trend": trend, "State": state, "Bars": self.counts})
+        return out[(out["Bars"] > min_bars) & out["Momentum"].notna()]
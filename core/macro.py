@@ -0,0 +1,118 @@
+import threading
+
+from core.lazy import lazy
+
+np = lazy("numpy")
+pd = lazy("pandas")
+
+# --- MACRO SIGNAL ENGINE ---
+# Yield-curve spread, MOVE regime and inflation trend as full aligned series,
+# computed column-wise over the whole history in one pass. The scanner prints
+# the last row; the dashboard charts every row.
+
+YIELD_10Y = "^TNX"
+YIELD_5Y = "^FVX"   # proxy for the short end: 2Y data is often restricted
+MOVE = "^MOVE"
+INFLATION = "RINF"
+SIGNAL_SYMBOLS = (YIELD_10Y, YIELD_5Y, MOVE, INFLATION)
+YIELD_SYMBOLS = (YIELD_10Y, YIELD_5Y)
+
+YIELD_SCALE_CUTOFF = 20   # a "yield" above 20% is Yahoo's x10 scaling, not a real rate
+SPREAD_FLAT = 0.15
+MOVE_STRESS = 100
+MOVE_CRISIS = 120
+INFLATION_RISING = 2.0
+LOOKBACK = 20
+
+
+def rescale_yield(values):
+    """Undo Yahoo's occasional x10 yield quotes (42.50 -> 4.25). Works on scalars, Series and frames."""
+    if np.isscalar(values):
+        return values / 10 if values > YIELD_SCALE_CUTOFF else values
+    return values.where(~(values > YIELD_SCALE_CUTOFF), values / 10)
+
+
+def _regime(values, levels, labels, default):
+    """Label each value by the first threshold it crosses; NaN stays unlabelled."""
+    out = np.select([cond(values) for cond in levels], labels, default).astype(object)
+    out[np.isnan(values)] = None
+    return out
+
+
+def signal_frame(close, lookback=LOOKBACK):
+    """Signal series over every row of a wide Close frame (yields already in raw Yahoo units).
+
+    The inflation trend is taken over RINF's own bars, so it is the same
+    `lookback`-bar change the scanner's momentum column shows for RINF.
+    """
+    close = close.reindex(columns=list(SIGNAL_SYMBOLS)).sort_index()
+    close = close.dropna(how="all")
+    close[list(YIELD_SYMBOLS)] = rescale_yield(close[list(YIELD_SYMBOLS)])
+    own = close[INFLATION].dropna()
+    trend = (own / own.shift(lookback) - 1) * 100
+    close = close.ffill()
+
+    spread = (close[YIELD_10Y] - close[YIELD_5Y]).to_numpy()
+    move = close[MOVE].to_numpy()
+    inflation = trend.reindex(close.index).ffill().to_numpy()
+
+    return pd.DataFrame({
+        'Yield 10Y': close[YIELD_10Y].to_numpy(),
+        'Yield 5Y': close[YIELD_5Y].to_numpy(),
+        'Spread': spread,
+        'Curve': _regime(spread, [lambda s: s < 0, lambda s: s < SPREAD_FLAT], ["INVERTED", "FLATTENING"], "NORMAL"),
+        'MOVE': move,
+        'Stress': _regime(move, [lambda m: m > MOVE_CRISIS, lambda m: m > MOVE_STRESS], ["CRISIS", "HIGH STRESS"], "CALM"),
+        'Inflation Trend': inflation,
+        'Inflation': _regime(inflation, [lambda i: i > INFLATION_RISING], ["RISING"], "STABLE"),
+    }, index=close.index)
+
+
+class MacroSignals:
+    """Signal history that grows with the price history.
+
+    update() recomputes from the last bar seen onwards (the store re-requests
+    it because it is often an intraday partial), plus the `lookback` RINF bars
+    the inflation trend needs as context. One engine is shared by every
+    dashboard session, so update() and the readouts hold the engine's lock.
+    """
+
+    def __init__(self, lookback=LOOKBACK):
+        self.lookback = lookback
+        self.frame = None
+        self._lock = threading.Lock()
+
+    @property
+    def last_date(self):
+        return None if self.frame is None or self.frame.empty else self.frame.index[-1]
+
+    def update(self, close):
+        with self._lock:
+            return self._update(close)
+
+    def _update(self, close):
+        close = close.sort_index()
+        if self.last_date is None:
+            self.frame = signal_frame(close, self.lookback)
+            return len(self.frame)
+        close = close.reindex(columns=list(SIGNAL_SYMBOLS)).dropna(how="all")
+        start = close.index.searchsorted(self.last_date, side="left")
+        if start >= len(close.index):
+            return 0
+        # Context: enough rows to hold `lookback` RINF bars before the first recomputed one
+        own = np.flatnonzero(close[INFLATION].notna().to_numpy()[:start])
+        context = own[-self.lookback] if len(own) >= self.lookback else 0
+        tail = signal_frame(close.iloc[min(context, max(start - 1, 0)):], self.lookback)
+        tail = tail.iloc[-(len(close.index) - start):]
+        kept = self.frame[self.frame.index < close.index[start]]
+        self.frame = pd.concat([kept, tail])
+        return len(tail)
+
+    def history(self):
+        """The full signal frame as of the last update (None before the first)."""
+        with self._lock:
+            return self.frame
+
+    def latest(self):
+        with self._lock:
+            return self.frame.iloc[-1] if self.last_date is not None else None
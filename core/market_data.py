@@ -0,0 +1,59 @@
+from core import metrics, providers
+from core.lazy import lazy
+
+pd = lazy("pandas")
+
+# --- SHARED PRICE FETCH LAYER ---
+# One batched, threaded download for the whole universe instead of one
+# yf.Ticker(symbol).history() round trip per asset.
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def fetch_history(symbols, period="3mo", interval="1d", start=None):
+    """Download OHLCV for every symbol in a single batched call.
+
+    Returns a wide frame with (field, symbol) columns on one shared date index.
+    Symbols Yahoo has no data for are simply absent from the columns.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return pd.DataFrame()
+
+    kwargs = {"start": start} if start is not None else {"period": period}
+    with metrics.timer("yahoo_request_seconds", interval=interval):
+        raw = providers.current().download(
+            symbols, interval=interval, group_by="column", auto_adjust=True,
+            actions=False, threads=True, progress=False, **kwargs
+        )
+    metrics.inc("yahoo_requests_total")
+    if raw is None or raw.empty:
+        metrics.inc("yahoo_symbols_total", len(symbols), result="empty")
+        return pd.DataFrame()
+
+    # Older yfinance releases return flat columns for a single ticker
+    if not isinstance(raw.columns, pd.MultiIndex):
+        raw.columns = pd.MultiIndex.from_product([raw.columns, symbols[:1]])
+
+    raw = raw.loc[:, raw.columns.get_level_values(0).isin(FIELDS)]
+    # Drop symbols that came back completely empty (delisted, bad ticker...)
+    present = raw['Close'].columns[raw['Close'].notna().any()]
+    raw = raw.loc[:, raw.columns.get_level_values(1).isin(present)]
+    metrics.inc("yahoo_symbols_total", len(present), result="ok")
+    if len(present) < len(symbols):
+        metrics.inc("yahoo_symbols_total", len(symbols) - len(present), result="empty")
+    return raw.sort_index()
+
+
+def symbol_history(frame, symbol):
+    """Per-symbol OHLCV slice of a wide frame, with the padding rows removed."""
+    if frame.empty or symbol not in frame.columns.get_level_values(1):
+        return pd.DataFrame(columns=FIELDS)
+    return frame.xs(symbol, axis=1, level=1).dropna(how="all")
+
+
+def close_prices(frame):
+    """Wide Close matrix (dates x symbols)."""
+    if frame.empty:
+        return pd.DataFrame()
+    return frame['Close']
@@ -0,0 +1,151 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# --- INSTRUMENTATION ---
+# Process-wide counters and latency histograms for every fetch / parse / cache
+# path. Recording is one dict update under a lock, cheap next to any network
+# call. Export as JSON or Prometheus text; the dashboard renders snapshot().
+
+PREFIX = "quant_"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RECENT_FAILURES = 100
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> float
+        self._histograms = {}  # (name, labels) -> _Histogram
+        self._failures = deque(maxlen=RECENT_FAILURES)
+
+    # --- RECORDING ---
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def failure(self, where, error, **labels):
+        """Count a failure by place and reason (exception type or status) and keep its message."""
+        reason = type(error).__name__ if isinstance(error, BaseException) else str(error)
+        self.inc("failures_total", where=where, reason=reason, **labels)
+        with self._lock:
+            self._failures.append({"time": time.time(), "where": where, "reason": reason,
+                                   "detail": str(error)[:300], **labels})
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._failures.clear()
+
+    # --- EXPORT ---
+    def snapshot(self):
+        from core.cache import all_stats
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._counters.items())]
+            histograms = [
+                {"name": n, "labels": dict(l), "count": h.count, "sum": h.total, "max": h.max,
+                 "mean": h.total / h.count if h.count else 0.0,
+                 "buckets": dict(zip(map(str, BUCKETS), h.buckets))}
+                for (n, l), h in sorted(self._histograms.items())
+            ]
+            failures = list(self._failures)
+        return {"counters": counters, "histograms": histograms, "caches": all_stats(), "failures": failures}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent, default=str)
+
+    def to_prometheus(self):
+        snap = self.snapshot()
+        lines, typed = [], set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for c in snap["counters"]:
+            name = PREFIX + c["name"]
+            header(name, "counter")
+            lines.append(f"{name}{_labels(c['labels'])} {c['value']}")
+        for h in snap["histograms"]:
+            name = PREFIX + h["name"]
+            header(name, "histogram")
+            running = 0
+            for bound, n in h["buckets"].items():
+                running += n
+                lines.append(f"{name}_bucket{_labels(h['labels'], le=bound)} {running}")
+            lines.append(f"{name}_bucket{_labels(h['labels'], le='+Inf')} {h['count']}")
+            lines.append(f"{name}_sum{_labels(h['labels'])} {h['sum']}")
+            lines.append(f"{name}_count{_labels(h['labels'])} {h['count']}")
+        for stats in snap["caches"]:
+            cache = stats["name"]
+            for field, value in stats.items():
+                if field != "name" and isinstance(value, (int, float)):
+                    name = f"{PREFIX}cache_{field}"
+                    header(name, "gauge")
+                    lines.append(f"{name}{_labels({'cache': cache})} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Dump to `path`: Prometheus text for *.prom / *.txt, JSON otherwise."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _labels(labels, **extra):
+    items = dict(labels, **extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items.items()) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Metrics()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+failure = REGISTRY.failure
+snapshot = REGISTRY.snapshot
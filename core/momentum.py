@@ -0,0 +1,88 @@
+from core.lazy import lazy
+
+np = lazy("numpy")
+pd = lazy("pandas")
+
+# --- VECTORIZED MOMENTUM ENGINE ---
+# Prices are held once as an (assets x bars) matrix. Momentum for any lookback,
+# or a whole vector of lookbacks, is one fancy-index + one divide.
+
+
+class PriceMatrix:
+    """Closes right-aligned per asset: values[i, -k] is asset i's k-th most recent bar.
+
+    Each asset keeps its own trading calendar (BTC trades weekends, FX doesn't),
+    so "20 bars ago" means what .iloc[-20] meant on that asset's own history.
+    """
+
+    def __init__(self, symbols, values, counts, dates):
+        self.symbols = list(symbols)
+        self.values = values
+        self.counts = counts
+        self.dates = dates  # last bar date per asset
+
+    @classmethod
+    def from_close(cls, close):
+        """Wide Close frame (dates x symbols) -> right-aligned matrix."""
+        if close.empty:
+            return cls([], np.empty((0, 0)), np.empty(0, dtype=int), np.empty(0, dtype="datetime64[ns]"))
+        values = close.to_numpy(dtype=float).T
+        valid = ~np.isnan(values)
+        # Stable sort on the validity mask moves NaNs left and keeps bar order
+        order = np.argsort(valid, axis=1, kind="stable")
+        packed = np.take_along_axis(values, order, axis=1)
+        index = close.index.to_numpy()
+        last = np.where(valid.any(axis=1), valid.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1), 0)
+        return cls(close.columns, packed, valid.sum(axis=1), index[last])
+
+    @property
+    def last(self):
+        return self.values[:, -1] if self.values.size else np.empty(0)
+
+    def row(self, symbol):
+        return self.symbols.index(symbol)
+
+
+def momentum(pm, lookbacks):
+    """% change from `lookback` bars back (.iloc[-lookback]) to the last bar.
+
+    `lookbacks` may be a scalar or a vector; the result is (assets x lookbacks).
+    Assets with fewer bars than a lookback get NaN for it.
+    """
+    lookbacks = np.atleast_1d(np.asarray(lookbacks, dtype=int))
+    n, width = pm.values.shape
+    if n == 0:
+        return np.empty((0, len(lookbacks)))
+    past = pm.values[:, -np.clip(lookbacks, 1, width)]
+    now = pm.values[:, -1][:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mom = (now - past) / past * 100
+    mom[pm.counts[:, None] < lookbacks[None, :]] = np.nan
+    return mom
+
+
+def is_accelerating(mom_long, mom_short):
+    # The long move outruns the short one
+    return np.abs(mom_long) > np.abs(mom_short)
+
+
+def is_bullish(mom_long):
+    return mom_long > 0
+
+
+def classify(mom_long, mom_short):
+    """ACCELERATING / DECELERATING and BULLISH / BEARISH labels, element-wise."""
+    state = np.where(is_accelerating(mom_long, mom_short), "ACCELERATING", "DECELERATING")
+    trend = np.where(is_bullish(mom_long), "BULLISH", "BEARISH")
+    return state, trend
+
+
+def momentum_frame(pm, lookback, short, min_bars=0):
+    """One-pass momentum / short momentum / trend / state for every asset."""
+    mom = momentum(pm, [lookback, short])
+    state, trend = classify(mom[:, 0], mom[:, 1])
+    out = pd.DataFrame({
+        "Symbol": pm.symbols, "Last": pm.last, "Momentum": mom[:, 0], "Short Momentum": mom[:, 1],
+        "Trend": trend, "State": state, "Bars": pm.counts,
+    })
+    return out[(out["Bars"] > min_bars) & out["Momentum"].notna()]
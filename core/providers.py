@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import threading
+
+from core.lazy import lazy
+
+pd = lazy("pandas")
+requests = lazy("requests")
+
+# --- DATA PROVIDERS ---
+# Every upstream call goes through the current provider: Yahoo as a batched
+# download(), Alpha Vantage and CFTC as plain HTTP GETs through session().
+# Swapping the provider records live traffic to disk, replays it offline, or
+# serves synthetic data, without touching any caller.
+#
+# Select one in code with use(), or from the environment:
+#   QT_PROVIDER=record:<dir>   live calls, every response saved under <dir>
+#   QT_PROVIDER=replay:<dir>   recorded responses only, no network
+
+# Request parts that identify the caller, not the data
+_VOLATILE_PARAMS = {"apikey"}
+
+
+class ReplayMiss(KeyError):
+    """A replayed request that was never recorded."""
+
+
+class Provider:
+    def download(self, symbols, **kwargs):
+        """yfinance.download() contract: wide (field, symbol) OHLCV frame."""
+        raise NotImplementedError
+
+    def session(self, pool_size=16):
+        """requests.Session-like object: get(url, params=, headers=, timeout=)."""
+        raise NotImplementedError
+
+
+class LiveProvider(Provider):
+    def download(self, symbols, **kwargs):
+        import yfinance as yf  # heavy import, only paid on the first live download
+        return yf.download(symbols, **kwargs)
+
+    def session(self, pool_size=16):
+        session = requests.Session()
+        session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        return session
+
+
+class Reply:
+    """Minimal requests.Response stand-in for replayed and synthetic HTTP."""
+
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def request_id(kind, *parts, **kwargs):
+    """Stable file name for one request, ignoring API keys and conditional headers."""
+    kwargs = {k: v for k, v in kwargs.items() if k not in _VOLATILE_PARAMS}
+    blob = json.dumps([kind, parts, kwargs], sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()[:20]
+
+
+def _download_id(symbols, kwargs):
+    kwargs = {k: v for k, v in kwargs.items() if k not in ("threads", "progress")}
+    return request_id("yahoo", list(symbols), **kwargs)
+
+
+def _http_id(url, params):
+    return request_id("http", url, **(params or {}))
+
+
+# --- RECORD ---
+class RecordingProvider(Provider):
+    def __init__(self, root, inner=None):
+        self.root = root
+        self.inner = inner or LiveProvider()
+        os.makedirs(os.path.join(root, "yahoo"), exist_ok=True)
+        os.makedirs(os.path.join(root, "http"), exist_ok=True)
+
+    def download(self, symbols, **kwargs):
+        frame = self.inner.download(symbols, **kwargs)
+        if frame is not None:
+            frame.to_parquet(os.path.join(self.root, "yahoo", _download_id(symbols, kwargs) + ".parquet"))
+        return frame
+
+    def session(self, pool_size=16):
+        return _RecordingSession(self.inner.session(pool_size), os.path.join(self.root, "http"))
+
+
+class _RecordingSession:
+    def __init__(self, inner, root):
+        self.inner = inner
+        self.root = root
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, **kwargs):
+        r = self.inner.get(url, params=params, **kwargs)
+        if r.status_code == 304:
+            return r  # nothing new to keep; the 200 recorded earlier is what replay serves
+        base = os.path.join(self.root, _http_id(url, params))
+        with self._lock:
+            with open(base + ".bin", "wb") as f:
+                f.write(r.content)
+            with open(base + ".json", "w") as f:
+                json.dump({"url": url, "params": {k: v for k, v in (params or {}).items() if k not in _VOLATILE_PARAMS},
+                           "status": r.status_code, "headers": dict(r.headers)}, f)
+        return r
+
+    def close(self):
+        self.inner.close()
+
+
+# --- REPLAY ---
+class ReplayProvider(Provider):
+    def __init__(self, root):
+        self.root = root
+
+    def download(self, symbols, **kwargs):
+        path = os.path.join(self.root, "yahoo", _download_id(symbols, kwargs) + ".parquet")
+        if not os.path.exists(path):
+            raise ReplayMiss(f"no recorded download for {list(symbols)[:5]} {kwargs}")
+        return pd.read_parquet(path)
+
+    def session(self, pool_size=16):
+        return _ReplaySession(os.path.join(self.root, "http"))
+
+
+class _ReplaySession:
+    def __init__(self, root):
+        self.root = root
+
+    def get(self, url, params=None, **kwargs):
+        base = os.path.join(self.root, _http_id(url, params))
+        if not os.path.exists(base + ".bin"):
+            raise ReplayMiss(f"no recorded response for {url} {params}")
+        with open(base + ".json") as f:
+            meta = json.load(f)
+        with open(base + ".bin", "rb") as f:
+            return Reply(f.read(), meta["status"], meta["headers"])
+
+    def close(self):
+        pass
+
+
+# --- SELECTION ---
+_current = None
+_lock = threading.Lock()
+
+
+def from_env(spec=None):
+    spec = spec if spec is not None else os.environ.get("QT_PROVIDER", "live")
+    mode, _, root = spec.partition(":")
+    if mode == "live":
+        return LiveProvider()
+    if mode == "record" and root:
+        return RecordingProvider(root)
+    if mode == "replay" and root:
+        return ReplayProvider(root)
+    raise ValueError(f"Unsupported QT_PROVIDER: {spec!r} (live | record:<dir> | replay:<dir>)")
+
+
+def current():
+    global _current
+    with _lock:
+        if _current is None:
+            _current = from_env()
+        return _current
+
+
+def use(provider):
+    """Route every later upstream call through `provider`; returns the previous one."""
+    global _current
+    with _lock:
+        previous, _current = _current, provider
+    return previous
@@ -0,0 +1,130 @@
+import heapq
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from core import metrics
+from core.lazy import lazy
+from core.market_data import close_prices, fetch_history
+from core.momentum import PriceMatrix, momentum_frame
+
+pd = lazy("pandas")
+
+# --- LARGE-UNIVERSE SCAN ENGINE ---
+# Symbols stream in from a file, are fetched in parallel batches, scored on a
+# process pool, and folded into fixed-size top-k / bottom-k heaps. Only the
+# batches currently in flight are ever held in memory.
+
+# macro_scanner semantics: "20 days ago" is .iloc[-21], "1 week ago" is .iloc[-6]
+LOOKBACK = 20
+SHORT = 5
+MIN_BARS = 25
+
+
+def load_universe(path):
+    """Yield symbols from a .txt (one per line, '#' comments) or a .csv with a symbol/ticker column."""
+    if path.lower().endswith(".csv"):
+        header = pd.read_csv(path, nrows=0).columns
+        col = next((c for c in header if str(c).strip().lower() in ("symbol", "ticker")), header[0])
+        for chunk in pd.read_csv(path, usecols=[col], chunksize=5000):
+            for sym in chunk[col].dropna().astype(str):
+                if sym.strip():
+                    yield sym.strip()
+        return
+    with open(path) as f:
+        for line in f:
+            sym = line.split("#", 1)[0].strip()
+            if sym:
+                yield sym
+
+
+def batched(iterable, size):
+    it = iter(iterable)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+
+def score_batch(close, lookback=LOOKBACK, short=SHORT, min_bars=MIN_BARS):
+    """Process-pool worker: wide Close frame -> list of result rows."""
+    pm = PriceMatrix.from_close(close)
+    scan = momentum_frame(pm, lookback + 1, short + 1, min_bars=min_bars - 1)
+    return list(scan[["Momentum", "Symbol", "Last", "Short Momentum", "Trend", "State"]].itertuples(index=False, name=None))
+
+
+class TopK:
+    """Running top-k and bottom-k by momentum in two bounded heaps."""
+
+    def __init__(self, k):
+        self.k = k
+        self._top = []     # min-heap of (mom, ...) -> smallest of the best k on top
+        self._bottom = []  # min-heap of (-mom, ...) -> largest of the worst k on top
+        self.seen = 0
+
+    def push(self, row):
+        self.seen += 1
+        mom = row[0]
+        for heap, item in ((self._top, row), (self._bottom, (-mom,) + row[1:])):
+            if len(heap) < self.k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    def top(self):
+        return sorted(self._top, reverse=True)
+
+    def bottom(self):
+        return sorted(((-r[0],) + r[1:] for r in self._bottom))
+
+
+def scan_universe(symbols, k=25, batch_size=200, fetch_workers=4, workers=None, period="3mo",
+                  fetch=fetch_history, on_batch=None):
+    """Scan an iterable of symbols; returns (TopK, n_requested, n_scored)."""
+    # The process pool pulls in multiprocessing (~30 ms): only pay for it when a scan runs
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranking = TopK(k)
+    requested = 0
+    workers = workers or os.cpu_count() or 1
+    batches = batched(symbols, batch_size)
+    max_inflight = max(fetch_workers, workers) * 2
+    # Scorers start while the fetch threads may hold locks; forking then can deadlock a worker
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetchers, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        fetching, scoring = set(), set()
+
+        def refill():
+            nonlocal requested
+            while len(fetching) + len(scoring) < max_inflight:
+                batch = next(batches, None)
+                if batch is None:
+                    return
+                requested += len(batch)
+                fetching.add(fetchers.submit(fetch, batch, period=period))
+
+        refill()
+        while fetching or scoring:
+            done, _ = wait(fetching | scoring, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut in fetching:
+                    fetching.discard(fut)
+                    try:
+                        close = close_prices(fut.result())
+                    except Exception as e:
+                        # A failed batch only loses its symbols; the scan carries on
+                        metrics.failure("scan.fetch", e)
+                        close = pd.DataFrame()
+                    if not close.empty:
+                        scoring.add(pool.submit(score_batch, close))
+                else:
+                    scoring.discard(fut)
+                    for row in fut.result():
+                        ranking.push(row)
+                    if on_batch:
+                        on_batch(requested, ranking.seen)
+            refill()
+
+    return ranking, requested, ranking.seen
@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import quote
+
+from core import metrics
+from core.lazy import lazy
+from core.market_data import FIELDS, fetch_history
+
+pd = lazy("pandas")
+
+# --- LOCAL OHLCV STORE ---
+# One Parquet file per symbol under data/ohlcv/<source>/. A refresh only asks
+# the provider for bars after the last stored date; a read is a local file load.
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ohlcv")
+DEFAULT_MAX_AGE = 15 * 60  # seconds a symbol counts as fresh after a sync
+
+_PERIODS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+
+
+def period_start(period, today=None):
+    """'3mo' / '10y' / '5d' -> first calendar date covered. None for 'max'."""
+    if period == "max":
+        return None
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    for suffix, unit in sorted(_PERIODS.items(), key=lambda kv: -len(kv[0])):
+        if period.endswith(suffix):
+            return today - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+class OHLCVStore:
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+        self._lock = threading.Lock()
+
+    # --- FILE LAYOUT ---
+    def _dir(self, source):
+        path = os.path.join(self.root, source)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _path(self, source, symbol):
+        return os.path.join(self._dir(source), quote(symbol, safe="") + ".parquet")
+
+    def _manifest_path(self, source):
+        return os.path.join(self._dir(source), "_manifest.json")
+
+    def manifest(self, source):
+        try:
+            with open(self._manifest_path(source)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _update_manifest(self, source, updates):
+        with self._lock:
+            manifest = self.manifest(source)
+            manifest.update(updates)
+            tmp = self._manifest_path(source) + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, self._manifest_path(source))
+
+    # --- READ / WRITE ---
+    def read(self, source, symbol, start=None):
+        try:
+            df = pd.read_parquet(self._path(source, symbol))
+        except (OSError, ValueError):
+            return pd.DataFrame(columns=FIELDS)
+        if start is not None:
+            df = df.loc[df.index >= start]
+        return df
+
+    def write(self, source, symbol, bars, covers=None):
+        """Merge new bars over the stored ones (new wins on overlapping dates).
+
+        `covers` is the first date a full download asked for ("" = everything
+        available); None for an incremental top-up.
+        """
+        merged, meta = self._merge(source, symbol, bars, covers, self.manifest(source))
+        self._update_manifest(source, {symbol: meta})
+        return merged
+
+    def _merge(self, source, symbol, bars, covers, manifest):
+        bars = bars.dropna(how="all")
+        old = self.read(source, symbol)
+        merged = pd.concat([old, bars]) if not old.empty else bars
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        path = self._path(source, symbol)
+        tmp = path + f".{threading.get_ident()}.tmp"
+        merged.to_parquet(tmp)
+        os.replace(tmp, path)
+
+        meta = dict(manifest.get(symbol, {}))
+        # "" sorts before any date, so min() keeps the widest coverage seen
+        candidates = [c for c in (meta.get("from"), covers) if c is not None]
+        meta["from"] = min(candidates) if candidates else str(merged.index[0].date())
+        meta["last"] = str(merged.index[-1].date())
+        meta["synced"] = time.time()
+        return merged, meta
+
+    def expire(self, source, symbols):
+        """Force the next history() call to top these symbols up from the provider."""
+        manifest = self.manifest(source)
+        self._update_manifest(source, {s: dict(manifest[s], synced=0) for s in symbols if s in manifest})
+
+    def is_fresh(self, source, symbol, max_age=DEFAULT_MAX_AGE):
+        meta = self.manifest(source).get(symbol)
+        return bool(meta) and time.time() - meta.get("synced", 0) < max_age
+
+    # --- YAHOO ENTRY POINT ---
+    def history(self, symbols, period="3mo", max_age=DEFAULT_MAX_AGE, source="yahoo", fetch=fetch_history):
+        """Wide (field, symbol) frame for `period`, same shape as fetch_history().
+
+        Symbols synced within `max_age` are served from disk; the rest are
+        topped up with one batched request per distinct last-stored date, and
+        symbols with no (or too little) history get one batched full download.
+        A symbol the provider returned nothing for stays fresh for `max_age`
+        too, so a delisted or bad ticker isn't re-downloaded on every read.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        start = period_start(period)
+        manifest = self.manifest(source)
+        now = time.time()
+
+        full, incremental = [], {}
+        for sym in symbols:
+            meta = manifest.get(sym)
+            fresh = meta is not None and now - meta.get("synced", 0) < max_age
+            covered = meta is not None and "from" in meta and (
+                meta["from"] == "" or (start is not None and meta["from"] <= str(start.date()))
+            )
+            # A full download that came back empty at least this far back
+            tried = meta is not None and "tried" in meta and (
+                meta["tried"] == "" or (start is not None and meta["tried"] <= str(start.date()))
+            )
+            if not covered:
+                if not (fresh and tried):
+                    full.append(sym)
+            elif now - meta.get("synced", 0) >= max_age:
+                # Re-request the last stored bar too: it may have been an intraday partial
+                incremental.setdefault(meta["last"], []).append(sym)
+
+        metrics.inc("store_symbols_total", len(symbols) - len(full) - sum(map(len, incremental.values())), result="fresh")
+        metrics.inc("store_symbols_total", sum(map(len, incremental.values())), result="incremental")
+        metrics.inc("store_symbols_total", len(full), result="full")
+        if full:
+            covers = "" if start is None else str(start.date())
+            self._ingest(source, full, fetch(full, period=period), covers=covers)
+        for last, syms in incremental.items():
+            self._ingest(source, syms, fetch(syms, start=last))
+
+        frames = {sym: self.read(source, sym, start=start) for sym in symbols}
+        frames = {sym: df for sym, df in frames.items() if not df.empty}
+        if not frames:
+            return pd.DataFrame()
+        wide = pd.concat(frames, axis=1).swaplevel(axis=1)
+        return wide.reindex(columns=FIELDS, level=0).sort_index()
+
+    def _ingest(self, source, symbols, wide, covers=None):
+        # One manifest rewrite per batch, not per symbol
+        manifest = self.manifest(source)
+        updates = {}
+        returned = wide.columns.get_level_values(1).unique() if not wide.empty else []
+        for sym in returned:
+            bars = wide.xs(sym, axis=1, level=1).dropna(how="all")
+            if not bars.empty:
+                updates[sym] = self._merge(source, sym, bars, covers, manifest)[1]
+        # Asked for but nothing came back: stamp the attempt so it waits out max_age
+        for sym in symbols:
+            if sym not in updates:
+                meta = dict(manifest.get(sym, {}), synced=time.time())
+                if covers is not None:
+                    meta["tried"] = covers
+                updates[sym] = meta
+        self._update_manifest(source, updates)
+
+
+_default = None
+
+
+def default_store():
+    global _default
+    if _default is None:
+        _default = OHLCVStore()
+    return _default
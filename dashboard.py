@@ -1,12 +1,24 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import requests
-import io
-import zipfile
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 
+from core import metrics
+from core.backtest import LOOKBACKS, REBALANCES, SHORTS, equity_curve, sweep
+from core.cache import cached
+from core.chart import downsample, ema
+from core.lazy import lazy
+from core.live import TIMEFRAMES, LiveEngine, LiveRanking, make_feed
+from core.correlation import RollingCovariance
+from core.cot import CotIndex, load_cot, refresh_current_year
+from core.macro import INFLATION_RISING, MOVE_CRISIS, MOVE_STRESS, SIGNAL_SYMBOLS, SPREAD_FLAT, YIELD_SYMBOLS, MacroSignals, rescale_yield
+from core.market_data import close_prices, symbol_history
+from core.momentum import PriceMatrix, momentum_frame
+from core.store import default_store
+from macro_scanner import assets as macro_assets
+
+# plotly only loads once a tab actually draws a figure
+go = lazy("plotly.graph_objects")
+
 # --- PAGE CONFIGURATION ---
 st.set_page_config(page_title="Momentum", layout="wide")
 st.title("📊 Quant Macro Terminal")
@@ -25,68 +37,188 @@ cot_map = {
     "10-Year Treasury": "10-YEAR U.S. TREASURY NOTES - CHICAGO BOARD OF TRADE"
 }
 
-tab1, tab2 = st.tabs(["🚀 Momentum Scanner", "🐋 COT Data (Statistical Depth)"])
+assets = [
+    {"symbol": "^TNX", "name": "US 10Y Yield", "type": "MACRO"},
+    {"symbol": "^FVX", "name": "US 5Y Yield", "type": "MACRO"},
+    {"symbol": "^MOVE", "name": "MOVE Index", "type": "MACRO"},
+    {"symbol": "RINF", "name": "Inflation ETF", "type": "MACRO"},
+    {"symbol": "EURUSD=X", "name": "Euro (EUR)", "type": "FX"},
+    {"symbol": "GBPUSD=X", "name": "Pound (GBP)", "type": "FX"},
+    {"symbol": "JPY=X", "name": "Yen (JPY)", "type": "FX"},
+    {"symbol": "CHF=X", "name": "Swiss Franc", "type": "FX"},
+    {"symbol": "BTC-USD", "name": "Bitcoin", "type": "CRYPTO"},
+    {"symbol": "GC=F", "name": "Gold", "type": "COMMODITY"},
+    {"symbol": "SI=F", "name": "Silver", "type": "COMMODITY"},
+    {"symbol": "CL=F", "name": "Crude Oil", "type": "COMMODITY"},
+    {"symbol": "^GSPC", "name": "S&P 500", "type": "INDEX"},
+    {"symbol": "^IXIC", "name": "Nasdaq 100", "type": "INDEX"},
+    {"symbol": "^GDAXI", "name": "DAX (Germany)", "type": "INDEX"},
+    {"symbol": "^N225", "name": "Nikkei (Japan)", "type": "INDEX"},
+    {"symbol": "000001.SS", "name": "Shanghai (China)", "type": "INDEX"}
+]
+
+# Cross-asset risk universe: dashboard assets plus the macro scanner's, one entry per symbol
+risk_universe = list({a['symbol']: a for a in macro_assets + assets}.values())
+
+# --- DATA LOADERS ---
+# Process-wide named caches shared by every session: concurrent reruns wait on one
+# in-flight fetch, and the hot datasets reload in the background before they expire.
+# A tab only calls the loaders it needs.
+@cached("momentum_prices", ttl=3600, maxsize=1, refresh_ahead=0.8)
+def get_price_matrix():
+    # Fetched once per TTL, independent of the lookback slider
+    prices = default_store().history([a['symbol'] for a in assets], period="3mo")
+    return PriceMatrix.from_close(close_prices(prices))
+
+@cached("chart_history", ttl=3600, maxsize=64)
+def get_chart_history(symbol, period):
+    return symbol_history(default_store().history([symbol], period=period), symbol)
+
+@cached("chart_ema", ttl=3600, maxsize=256)
+def get_chart_ema(symbol, period, span):
+    # Daily EMA per (symbol, timeframe, span): changing the span never refetches bars
+    return ema(get_chart_history(symbol, period)['Close'], span)
+
+@cached("chart_view", ttl=3600, maxsize=64)
+def get_chart_view(symbol, period, span, start, end):
+    # What actually ships to the browser: the zoomed slice, aggregated to at most a few hundred candles
+    bars = get_chart_history(symbol, period)
+    bars = bars[(bars.index >= start) & (bars.index <= end)]
+    line = get_chart_ema(symbol, period, span)
+    return downsample(bars, {'EMA': line[(line.index >= start) & (line.index <= end)]})
+
+def get_momentum_data(days):
+    # Pure NumPy on the cached matrix: moving the slider never touches the network
+    pm = get_price_matrix()
+    return ranking_table(momentum_frame(pm, lookback=days, short=5, min_bars=25))
+
+def ranking_table(scan):
+    meta = pd.DataFrame(assets).rename(columns={'symbol': 'Symbol', 'name': 'Asset', 'type': 'Type'})
+    df = meta.merge(scan, on='Symbol')
+    df['Price'] = rescale_yield(df['Last']).where(df['Symbol'].isin(YIELD_SYMBOLS), df['Last'])
+    df['Momentum (%)'] = df['Momentum'].round(2)
+    return df[['Asset', 'Symbol', 'Type', 'Price', 'Momentum (%)', 'Trend', 'State']]
+
+# --- LIVE MODE ---
+# One feed + bar aggregator per server process. Each session keeps its own
+# LiveRanking and a cursor into the engine's change log, so a refresh only
+# recomputes the rows whose price moved.
+LIVE_REFRESH = "5s"
+
+@cached("live_engine", ttl=86400, maxsize=1)
+def get_live_engine():
+    return LiveEngine(make_feed([a['symbol'] for a in assets]))
+
+@st.fragment(run_every=LIVE_REFRESH)
+def live_ranking(lookback_days):
+    # Fragment: reruns on its own timer without rerunning the rest of the page
+    engine = get_live_engine()
+    engine.pump()
+    pm = get_price_matrix()
+    # A replaced engine restarts its seq, so a cursor from the old one would hide every change
+    key = (lookback_days, id(pm), id(engine))
+    state = st.session_state.get("live_ranking")
+    if state is None or state[0] != key:
+        state = (key, LiveRanking(pm, lookback_days, 5), 0)
+    _, ranking, cursor = state
+    moved, cursor = engine.changes_since(cursor)
+    changed = ranking.update(moved)
+    st.session_state["live_ranking"] = (key, ranking, cursor)
+
+    df = ranking_table(ranking.frame(min_bars=25)).sort_values(by="Momentum (%)", ascending=False)
+    st.caption(f"⚡ Live · {len(changed)} rows updated · {datetime.now().strftime('%H:%M:%S')}")
+    st.dataframe(df[['Asset', 'Price', 'Momentum (%)', 'Trend', 'State']], use_container_width=True)
+
+@st.fragment(run_every=LIVE_REFRESH)
+def live_chart(symbol, name):
+    tf = st.radio("Live Bars", list(TIMEFRAMES), horizontal=True, key="live_tf")
+    engine = get_live_engine()
+    engine.pump()
+    bars = engine.history(symbol, tf)
+    if bars.empty:
+        st.info("Waiting for live bars...")
+        return
+    fig = go.Figure(go.Candlestick(x=bars.index, open=bars['Open'], high=bars['High'], low=bars['Low'], close=bars['Close'], name=f"{name} ({tf})"))
+    fig.update_layout(title=f"{name} · Live {tf}", template="plotly_dark", height=450, xaxis_rangeslider_visible=False)
+    st.plotly_chart(fig, use_container_width=True)
+
+@cached("cot_index", ttl=86400, maxsize=2, refresh_ahead=0.8)
+def fetch_historical_cot(years_back):
+    # Closed years come from the local Parquet cache; only the open year is revalidated.
+    # Partitioned by market once per load; every rerun gets the same index, not a copy.
+    return CotIndex(load_cot(years_back))
+
+@cached("backtest_prices", ttl=3600, maxsize=1)
+def get_backtest_closes():
+    # Tradable assets only: yields and the MOVE index are signals, not positions
+    symbols = [a['symbol'] for a in assets if a['type'] != "MACRO"]
+    return close_prices(default_store().history(symbols, period="10y"))
+
+@cached("risk_prices", ttl=3600, maxsize=1, refresh_ahead=0.8)
+def get_risk_closes():
+    return close_prices(default_store().history([a['symbol'] for a in risk_universe], period="2y"))
+
+@cached("risk_engine", ttl=86400, maxsize=4)
+def _risk_engine(window):
+    return RollingCovariance([a['symbol'] for a in risk_universe], window)
+
+def get_risk_engine(window):
+    # One long-lived engine per window: each price refresh only feeds the bars it
+    # hasn't seen yet, O(assets^2) per new bar instead of rebuilding the window.
+    # The engine serialises sessions itself: this script re-runs as a fresh module.
+    engine = _risk_engine(window)
+    engine.update_from_closes(get_risk_closes())
+    return engine
+
+@cached("macro_prices", ttl=3600, maxsize=1, refresh_ahead=0.8)
+def get_macro_closes():
+    return close_prices(default_store().history(list(SIGNAL_SYMBOLS), period="max"))
+
+@cached("macro_engine", ttl=86400, maxsize=1)
+def _macro_engine():
+    return MacroSignals()
+
+def get_macro_signals():
+    # Full history computed once; later refreshes only evaluate the new bars
+    engine = _macro_engine()
+    engine.update(get_macro_closes())
+    return engine.history()
+
+def last_years(close, years):
+    # An empty download has no last date to count back from
+    if close.empty:
+        return close
+    return close[close.index >= close.index[-1] - pd.DateOffset(years=years)]
+
+@cached("backtest_sweep", ttl=3600, maxsize=8)
+def run_sweep(years, shorts, rebalances, cost_bps):
+    return sweep(last_years(get_backtest_closes(), years), LOOKBACKS, shorts, rebalances, cost_bps)
 
 # ==============================================================================
 # TAB 1: MOMENTUM SCANNER
 # ==============================================================================
-with tab1:
+def momentum_tab():
     st.markdown("*> Real-time Mechanical Market Analysis*")
     col1, col2 = st.columns([1, 3])
     with col1:
         lookback_days = st.slider("Momentum Lookback (Days)", 10, 60, 20)
-    
-    assets = [
-        {"symbol": "^TNX", "name": "US 10Y Yield", "type": "MACRO"},
-        {"symbol": "^FVX", "name": "US 5Y Yield", "type": "MACRO"},
-        {"symbol": "^MOVE", "name": "MOVE Index", "type": "MACRO"},
-        {"symbol": "RINF", "name": "Inflation ETF", "type": "MACRO"},
-        {"symbol": "EURUSD=X", "name": "Euro (EUR)", "type": "FX"},
-        {"symbol": "GBPUSD=X", "name": "Pound (GBP)", "type": "FX"},
-        {"symbol": "JPY=X", "name": "Yen (JPY)", "type": "FX"},
-        {"symbol": "CHF=X", "name": "Swiss Franc", "type": "FX"},
-        {"symbol": "BTC-USD", "name": "Bitcoin", "type": "CRYPTO"},
-        {"symbol": "GC=F", "name": "Gold", "type": "COMMODITY"},
-        {"symbol": "SI=F", "name": "Silver", "type": "COMMODITY"},
-        {"symbol": "CL=F", "name": "Crude Oil", "type": "COMMODITY"},
-        {"symbol": "^GSPC", "name": "S&P 500", "type": "INDEX"},
-        {"symbol": "^IXIC", "name": "Nasdaq 100", "type": "INDEX"},
-        {"symbol": "^GDAXI", "name": "DAX (Germany)", "type": "INDEX"},
-        {"symbol": "^N225", "name": "Nikkei (Japan)", "type": "INDEX"},
-        {"symbol": "000001.SS", "name": "Shanghai (China)", "type": "INDEX"}
-    ]
-
-    @st.cache_data(ttl=3600)
-    def get_momentum_data(days):
-        data_list = []
-        for asset in assets:
-            try:
-                ticker = yf.Ticker(asset['symbol'])
-                hist = ticker.history(period="3mo")
-                if len(hist) > 25:
-                    price_now = hist['Close'].iloc[-1]
-                    price_past = hist['Close'].iloc[-days]
-                    price_short = hist['Close'].iloc[-5]
-                    mom_long = ((price_now - price_past) / price_past) * 100
-                    mom_short = ((price_now - price_short) / price_short) * 100
-                    state = "ACCELERATING" if abs(mom_long) > abs(mom_short) else "DECELERATING"
-                    trend = "BULLISH" if mom_long > 0 else "BEARISH"
-                    if asset['type'] == "MACRO" and "Yield" in asset['name'] and price_now > 20:
-                        display_price = price_now / 10
-                    else: display_price = price_now
-                    data_list.append({"Asset": asset['name'], "Symbol": asset['symbol'], "Type": asset['type'], "Price": display_price, "Momentum (%)": round(mom_long, 2), "Trend": trend, "State": state})
-            except: pass
-        return pd.DataFrame(data_list)
+    with col2:
+        live = st.toggle("⚡ Live Mode", key="live_mode", help="Stream intraday prices into the ranking and chart")
 
     df = get_momentum_data(lookback_days)
     if st.button('🔄 REFRESH MOMENTUM', type="primary"):
-        st.cache_data.clear()
+        # Only the momentum prices: charts and COT stay cached
+        default_store().expire("yahoo", [a['symbol'] for a in assets])
+        get_price_matrix.invalidate()
         df = get_momentum_data(lookback_days)
 
     st.subheader("Asset Ranking")
     if not df.empty:
         sorted_df = df.sort_values(by="Momentum (%)", ascending=False)
-        st.dataframe(sorted_df[['Asset', 'Price', 'Momentum (%)', 'Trend', 'State']], use_container_width=True)
+        if live:
+            live_ranking(lookback_days)
+        else:
+            st.dataframe(sorted_df[['Asset', 'Price', 'Momentum (%)', 'Trend', 'State']], use_container_width=True)
 
         st.markdown("---")
         st.subheader("📈 Deep Dive Analysis")
@@ -97,73 +229,27 @@ with tab1:
         
         tf_map = {"1 Month": "1mo", "3 Months": "3mo", "6 Months": "6mo", "1 Year": "1y", "3 Years": "3y", "5 Years": "5y", "10 Years": "10y"}
         symbol = sorted_df.loc[sorted_df['Asset'] == chart_asset_name, 'Symbol'].values[0]
-        chart_data = yf.Ticker(symbol).history(period=tf_map[timeframe])
+        period = tf_map[timeframe]
+        chart_data = get_chart_history(symbol, period)
         if not chart_data.empty:
+            # Long ranges arrive as weekly/monthly candles; narrowing the zoom brings daily detail back
+            first, last = chart_data.index[0].date(), chart_data.index[-1].date()
+            zoom = st.slider("Zoom", min_value=first, max_value=last, value=(first, last), key=f"zoom_{symbol}_{period}") if first < last else (first, last)
+            candles, lines, bar_size = get_chart_view(symbol, period, ema_length, pd.Timestamp(zoom[0]), pd.Timestamp(zoom[1]))
             fig = go.Figure()
-            fig.add_trace(go.Candlestick(x=chart_data.index, open=chart_data['Open'], high=chart_data['High'], low=chart_data['Low'], close=chart_data['Close'], name=chart_asset_name))
-            ema_line = chart_data['Close'].ewm(span=ema_length, adjust=False).mean()
-            fig.add_trace(go.Scatter(x=chart_data.index, y=ema_line, mode='lines', name=f'{ema_length}-Day EMA', line=dict(color='orange', width=2)))
+            fig.add_trace(go.Candlestick(x=candles.index, open=candles['Open'], high=candles['High'], low=candles['Low'], close=candles['Close'], name=f"{chart_asset_name} ({bar_size})"))
+            fig.add_trace(go.Scatter(x=candles.index, y=lines['EMA'], mode='lines', name=f'{ema_length}-Day EMA', line=dict(color='orange', width=2)))
             fig.update_layout(template="plotly_dark", height=600, xaxis_rangeslider_visible=False)
             st.plotly_chart(fig, use_container_width=True)
+        if live:
+            live_chart(symbol, chart_asset_name)
 
 # ==============================================================================
 # TAB 2: COT DATA ENGINE (HISTORICAL BARS + MULTI-GROUP STATS)
 # ==============================================================================
-with tab2:
+def cot_tab():
     st.markdown("*> Institutional Bias vs. Commercial Hedging vs. Retail Sentiment*")
 
-    @st.cache_data(ttl=86400) 
-    def fetch_historical_cot(years_back):
-        all_data = []
-        current_year = datetime.now().year
-        for y in range(current_year - years_back, current_year + 1):
-            url = f"https://www.cftc.gov/files/dea/history/deacot{y}.zip"
-            try:
-                r = requests.get(url, timeout=10)
-                z = zipfile.ZipFile(io.BytesIO(r.content))
-                df_year = pd.read_csv(z.open(z.namelist()[0]), low_memory=False)
-                
-                def find_col(keywords, excludes=None):
-                    for col in df_year.columns:
-                        c = str(col).lower().replace("_", " ").strip()
-                        if all(k.lower() in c for k in keywords):
-                            if excludes and any(e.lower() in c for e in excludes): continue
-                            return col
-                    return None
-
-                c_map = {
-                    'Market': find_col(["market", "name"]),
-                    'DateRaw': find_col(["date"]),
-                    'NC_Long': find_col(["noncomm", "long"], excludes=["old", "other"]),
-                    'NC_Short': find_col(["noncomm", "short"], excludes=["old", "other"]),
-                    'C_Long': find_col(["comm", "long"], excludes=["non", "old"]),
-                    'C_Short': find_col(["comm", "short"], excludes=["non", "old"]),
-                    'NR_Long': find_col(["nonrept", "long"]),
-                    'NR_Short': find_col(["nonrept", "short"])
-                }
-                found = {k: v for k, v in c_map.items() if v is not None}
-                if len(found) >= 4:
-                    df_temp = df_year[list(found.values())].copy()
-                    df_temp.columns = list(found.keys())
-                    df_temp['Date'] = pd.to_datetime(df_temp['DateRaw'], format='%y%m%d', errors='coerce')
-                    all_data.append(df_temp)
-            except: continue
-        
-        if not all_data: return pd.DataFrame()
-        full_df = pd.concat(all_data).sort_values(by='Date').drop_duplicates()
-        
-        num_cols = ['NC_Long', 'NC_Short', 'C_Long', 'C_Short', 'NR_Long', 'NR_Short']
-        for col in num_cols:
-            if col in full_df.columns:
-                full_df[col] = pd.to_numeric(full_df[col], errors='coerce').fillna(0)
-        
-        # Explicit calculations for all 3 groups
-        full_df['Net_NC'] = full_df.get('NC_Long', 0) - full_df.get('NC_Short', 0) # Smart Money
-        full_df['Net_C'] = full_df.get('C_Long', 0) - full_df.get('C_Short', 0)   # Hedgers
-        full_df['Net_NR'] = full_df.get('NR_Long', 0) - full_df.get('NR_Short', 0) # Retail
-        
-        return full_df.dropna(subset=['Date'])
-
     # --- UI CONTROLS ---
     c_a, c_b, c_c = st.columns([2, 1, 1])
     with c_a: 
@@ -172,9 +258,11 @@ with tab2:
         cot_tf = st.selectbox("Lookback Period", ["3 Months", "6 Months", "1 Year", "3 Years", "5 Years", "10 Years"], index=2)
     with c_c:
         if st.button("🔄 REFRESH COT"):
-            st.cache_data.clear()
-            cot_data = fetch_historical_cot(10)
-        else: cot_data = fetch_historical_cot(10)
+            # Only the open year is re-read; closed years stay in memory
+            refresh_current_year()
+            fetch_historical_cot.invalidate()
+            cot_index = fetch_historical_cot(10)
+        else: cot_index = fetch_historical_cot(10)
 
     # Participant Filter
     st.markdown("**Show Participants on Chart:**")
@@ -183,24 +271,21 @@ with tab2:
     with cp_2: show_c  = st.checkbox("Hedgers (Commercial)", value=True)
     with cp_3: show_nr = st.checkbox("Retail (Non-Reportable)", value=False)
 
-    if not cot_data.empty:
+    if not cot_index.empty:
         tf_days = {"3 Months": 90, "6 Months": 180, "1 Year": 365, "3 Years": 1095, "5 Years": 1825, "10 Years": 3650}
         cutoff = datetime.now() - timedelta(days=tf_days[cot_tf])
-        asset_key = cot_map[selected_asset].split("-")[0].strip()
-        filtered = cot_data[(cot_data['Market'].str.contains(asset_key, case=False)) & (cot_data['Date'] >= cutoff)].copy()
+        filtered = cot_index.since(cot_map[selected_asset], cutoff)
         
         if not filtered.empty:
-            # Stats for the primary selected group (Smart Money)
-            avg_nc = filtered['Net_NC'].mean()
-            std_nc = filtered['Net_NC'].std()
+            # Rolling stats were precomputed for every market at load time
             latest = filtered.iloc[-1]
             
-            # --- METRICS BAR (Matches timeframe) ---
+            # --- METRICS BAR ---
             m1, m2, m3, m4 = st.columns(4)
-            m1.metric("Smart Money (Latest)", f"{latest['Net_NC']:,.0f}")
-            m2.metric("Hedgers (Latest)", f"{latest['Net_C']:,.0f}")
-            m3.metric("Retail (Latest)", f"{latest['Net_NR']:,.0f}")
-            m4.metric(f"Avg Smart Money ({cot_tf})", f"{avg_nc:,.0f}")
+            m1.metric("Smart Money (Latest)", f"{latest['Net_NC']:,.0f}", f"{latest['Net_NC_WoW']:+,.0f} WoW")
+            m2.metric("Hedgers (Latest)", f"{latest['Net_C']:,.0f}", f"{latest['Net_C_WoW']:+,.0f} WoW")
+            m3.metric("Retail (Latest)", f"{latest['Net_NR']:,.0f}", f"{latest['Net_NR_WoW']:+,.0f} WoW")
+            m4.metric("Smart Money 1Y Percentile", f"{latest['Net_NC_Pct']:.0f}%")
             
             # --- BAR CHART VISUALIZATION ---
             fig_cot = go.Figure()
@@ -212,19 +297,208 @@ with tab2:
             if show_nr:
                 fig_cot.add_trace(go.Bar(x=filtered['Date'], y=filtered['Net_NR'], name='Retail', marker_color='#AB63FA', opacity=0.7))
             
-            # --- STATISTICAL BANDS (Based on Smart Money) ---
-            fig_cot.add_trace(go.Scatter(x=filtered['Date'], y=[avg_nc]*len(filtered), name='Average', line=dict(color='white', dash='dash', width=1.5)))
+            # --- STATISTICAL BANDS (Smart Money, rolling 52 weeks) ---
+            avg_nc, std_nc = filtered['Net_NC_Mean'], filtered['Net_NC_Std']
+            fig_cot.add_trace(go.Scatter(x=filtered['Date'], y=avg_nc, name='1Y Average', line=dict(color='white', dash='dash', width=1.5)))
             
             # 1st Standard Deviation (Cyan - High Visibility)
-            fig_cot.add_trace(go.Scatter(x=filtered['Date'], y=[avg_nc + std_nc]*len(filtered), name='+1 Std Dev', line=dict(color='cyan', width=1.5, dash='dot')))
-            fig_cot.add_trace(go.Scatter(x=filtered['Date'], y=[avg_nc - std_nc]*len(filtered), name='-1 Std Dev', line=dict(color='cyan', width=1.5, dash='dot'), showlegend=False))
+            fig_cot.add_trace(go.Scatter(x=filtered['Date'], y=avg_nc + std_nc, name='+1 Std Dev', line=dict(color='cyan', width=1.5, dash='dot')))
+            fig_cot.add_trace(go.Scatter(x=filtered['Date'], y=avg_nc - std_nc, name='-1 Std Dev', line=dict(color='cyan', width=1.5, dash='dot'), showlegend=False))
             
             # 2nd Standard Deviation (Red - Danger Zone)
-            fig_cot.add_trace(go.Scatter(x=filtered['Date'], y=[avg_nc + 2*std_nc]*len(filtered), name='+2 Std Dev (EXTREME)', line=dict(color='red', width=2.5)))
-            fig_cot.add_trace(go.Scatter(x=filtered['Date'], y=[avg_nc - 2*std_nc]*len(filtered), name='-2 Std Dev (EXTREME)', line=dict(color='red', width=2.5), showlegend=False))
+            fig_cot.add_trace(go.Scatter(x=filtered['Date'], y=avg_nc + 2*std_nc, name='+2 Std Dev (EXTREME)', line=dict(color='red', width=2.5)))
+            fig_cot.add_trace(go.Scatter(x=filtered['Date'], y=avg_nc - 2*std_nc, name='-2 Std Dev (EXTREME)', line=dict(color='red', width=2.5), showlegend=False))
 
             fig_cot.update_layout(title=f"Positioning Comparison: {selected_asset} ({cot_tf})", barmode='group', template="plotly_dark", height=600, hovermode="x unified")
             st.plotly_chart(fig_cot, use_container_width=True)
             
-            st.success(f"**Smart Money Z-Score:** Positioning is **{((latest['Net_NC'] - avg_nc) / std_nc):.2f} standard deviations** from the mean.")
-        else: st.warning("No data found for this period.")
\ No newline at end of file
+            if pd.notna(latest['Net_NC_Z']):
+                st.success(f"**Smart Money Z-Score:** Positioning is **{latest['Net_NC_Z']:.2f} standard deviations** from its 1-year mean.")
+            else: st.info("Not enough history for a 1-year Z-Score yet.")
+        else: st.warning("No data found for this period.")
+
+        # --- CROSS-MARKET SCREENER (precomputed latest reading per market) ---
+        st.markdown("---")
+        st.subheader("🧭 Most Extreme Positioning (All Markets)")
+        groups = {"Smart Money (Non-Comm)": "Net_NC", "Hedgers (Commercial)": "Net_C", "Retail (Non-Reportable)": "Net_NR"}
+        s1, s2 = st.columns([2, 1])
+        with s1: screen_group = st.selectbox("Participant Group", list(groups), key="cot_screen_group")
+        with s2: screen_n = st.number_input("Markets", min_value=5, max_value=50, value=15, step=5)
+        col = groups[screen_group]
+        ranked = cot_index.extremes(col, n=screen_n)
+        if not ranked.empty:
+            table = ranked[['Market', 'Date', col, f'{col}_Z', f'{col}_Pct', f'{col}_WoW']].rename(columns={
+                col: 'Net Position', f'{col}_Z': 'Z-Score (1Y)', f'{col}_Pct': 'Percentile (1Y)', f'{col}_WoW': 'WoW Change'})
+            table['Market'] = table['Market'].astype(str)
+            st.dataframe(table.style.format({'Net Position': '{:,.0f}', 'Z-Score (1Y)': '{:+.2f}', 'Percentile (1Y)': '{:.0f}%', 'WoW Change': '{:+,.0f}', 'Date': '{:%Y-%m-%d}'}), use_container_width=True, hide_index=True)
+
+# ==============================================================================
+# TAB 3: MOMENTUM STRATEGY BACKTEST (FULL PARAMETER SWEEP)
+# ==============================================================================
+def backtest_tab():
+    st.markdown("*> Does BULLISH + ACCELERATING pay? Equal-weight long book, rebuilt at each rebalance*")
+    rb_names = {1: "Daily", 5: "Weekly", 10: "Bi-Weekly", 21: "Monthly"}
+
+    b1, b2, b3, b4 = st.columns([1, 2, 2, 1])
+    with b1: years = st.slider("History (Years)", 1, 10, 10)
+    with b2: shorts = st.multiselect("Short Windows (Days)", list(range(2, 21)), default=list(SHORTS))
+    with b3: rebalances = st.multiselect("Rebalance", list(rb_names), default=list(REBALANCES), format_func=rb_names.get)
+    with b4: cost_bps = st.number_input("Cost (bps/turnover)", min_value=0.0, max_value=50.0, value=2.0, step=0.5)
+
+    if not shorts or not rebalances:
+        st.warning("Pick at least one short window and one rebalance frequency.")
+        return
+    results = run_sweep(years, tuple(sorted(shorts)), tuple(sorted(rebalances)), cost_bps)
+    if results.empty:
+        st.warning("Not enough price history for a backtest.")
+        return
+
+    best = results.loc[results['Sharpe'].idxmax()]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Configurations Tested", f"{len(results):,}")
+    m2.metric("Best Sharpe", f"{best['Sharpe']:.2f}", f"L{best['Lookback']:.0f} / S{best['Short']:.0f} / {rb_names[int(best['Rebalance'])]}")
+    m3.metric("Best CAGR", f"{best['CAGR']*100:.1f}%")
+    m4.metric("Best Max Drawdown", f"{best['MaxDD']*100:.1f}%")
+
+    # --- SHARPE HEATMAP (Lookback x Short) ---
+    heat_rb = st.selectbox("Heatmap Rebalance", sorted(rebalances), format_func=rb_names.get,
+                           index=sorted(rebalances).index(int(best['Rebalance'])))
+    grid = results[results['Rebalance'] == heat_rb].pivot(index='Short', columns='Lookback', values='Sharpe')
+    fig_heat = go.Figure(go.Heatmap(z=grid.values, x=grid.columns, y=grid.index, colorscale='RdYlGn', zmid=0, colorbar=dict(title="Sharpe")))
+    fig_heat.update_layout(title="Sharpe Ratio by Lookback / Short Window", xaxis_title="Lookback (Days)", yaxis_title="Short Window (Days)", template="plotly_dark", height=450)
+    st.plotly_chart(fig_heat, use_container_width=True)
+
+    # --- TOP CONFIGURATIONS ---
+    top = results.sort_values('Sharpe', ascending=False).head(15).copy()
+    top['Rebalance'] = top['Rebalance'].map(rb_names)
+    st.dataframe(top.style.format({'CAGR': '{:.2%}', 'Vol': '{:.2%}', 'Sharpe': '{:.2f}', 'MaxDD': '{:.2%}', 'Total': '{:.2%}', 'Turnover': '{:.1f}'}), use_container_width=True)
+
+    # --- EQUITY CURVE FOR THE BEST CONFIG ---
+    close = last_years(get_backtest_closes(), years)
+    curve = equity_curve(close, int(best['Lookback']), int(best['Short']), int(best['Rebalance']), cost_bps)
+    fig_eq = go.Figure()
+    fig_eq.add_trace(go.Scatter(x=curve.index, y=curve['Strategy'], name='Best Config', line=dict(color='#00CC96', width=2)))
+    fig_eq.add_trace(go.Scatter(x=curve.index, y=curve['Equal Weight'], name='Equal Weight (Buy & Hold)', line=dict(color='white', dash='dash', width=1.5)))
+    fig_eq.update_layout(title="Equity Curve (Growth of 1)", template="plotly_dark", height=450, hovermode="x unified")
+    st.plotly_chart(fig_eq, use_container_width=True)
+
+# ==============================================================================
+# TAB 4: CROSS-ASSET RISK (ROLLING CORRELATION / VOL / BETA)
+# ==============================================================================
+def risk_tab():
+    st.markdown("*> Rolling correlation, volatility and beta across the dashboard and macro-scanner universe*")
+    names = {a['symbol']: a['name'] for a in risk_universe}
+
+    r1, r2 = st.columns([1, 2])
+    with r1: window = st.selectbox("Window (Days)", [20, 60, 120, 252], index=1)
+    with r2: bench = st.selectbox("Beta Benchmark", list(names), index=list(names).index("^GSPC"), format_func=names.get)
+
+    engine = get_risk_engine(window)
+    if engine.count < 2:
+        st.warning("Not enough price history for the rolling window.")
+        return
+    st.caption(f"Window: last {engine.count} bars through {pd.Timestamp(engine.last_date).date()}")
+
+    # --- CORRELATION HEATMAP ---
+    corr = engine.corr()
+    labels = [names[s] for s in corr.index]
+    fig_corr = go.Figure(go.Heatmap(z=corr.values, x=labels, y=labels, colorscale='RdBu', zmin=-1, zmax=1, colorbar=dict(title="Corr")))
+    fig_corr.update_layout(title=f"{window}-Day Return Correlation", template="plotly_dark", height=700)
+    st.plotly_chart(fig_corr, use_container_width=True)
+
+    # --- VOLATILITY & BETA ---
+    stats = pd.DataFrame({'Asset': labels, 'Volatility': engine.vol().values, 'Beta': engine.beta(bench).values})
+    c1, c2 = st.columns(2)
+    with c1:
+        v = stats.sort_values('Volatility')
+        fig_vol = go.Figure(go.Bar(x=v['Volatility'] * 100, y=v['Asset'], orientation='h', marker_color='#636EFA'))
+        fig_vol.update_layout(title="Annualised Volatility (%)", template="plotly_dark", height=600)
+        st.plotly_chart(fig_vol, use_container_width=True)
+    with c2:
+        b = stats.sort_values('Beta')
+        fig_beta = go.Figure(go.Bar(x=b['Beta'], y=b['Asset'], orientation='h',
+                                    marker_color=['#00CC96' if x >= 0 else '#EF553B' for x in b['Beta']]))
+        fig_beta.update_layout(title=f"Beta vs {names[bench]}", template="plotly_dark", height=600)
+        st.plotly_chart(fig_beta, use_container_width=True)
+
+# ==============================================================================
+# TAB 5: MACRO REGIME HISTORY (YIELD CURVE / MOVE / INFLATION)
+# ==============================================================================
+def macro_tab():
+    st.markdown("*> Yield-curve, bond-volatility and inflation regimes over the full history*")
+    signals = get_macro_signals()
+    if signals is None or signals.empty:
+        st.warning("No macro signal history available.")
+        return
+
+    years = st.slider("History (Years)", 1, 30, 10, key="macro_years")
+    view = signals[signals.index >= signals.index[-1] - pd.DateOffset(years=years)]
+    latest = signals.ffill().iloc[-1]
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Yield Curve (10Y - 5Y)", f"{latest['Spread']:.2f}%", latest['Curve'], delta_color="off")
+    m2.metric("MOVE Index", f"{latest['MOVE']:.0f}", latest['Stress'], delta_color="off")
+    m3.metric("Inflation Trend (RINF 20D)", f"{latest['Inflation Trend']:.2f}%", latest['Inflation'], delta_color="off")
+
+    panels = [
+        ('Spread', "Yield Curve Spread (10Y - 5Y, %)", [(0, 'red'), (SPREAD_FLAT, 'orange')]),
+        ('MOVE', "MOVE Index (Bond Volatility)", [(MOVE_STRESS, 'orange'), (MOVE_CRISIS, 'red')]),
+        ('Inflation Trend', "Inflation Trend (RINF 20-Day %)", [(INFLATION_RISING, 'red')]),
+    ]
+    for col, title, levels in panels:
+        fig = go.Figure(go.Scatter(x=view.index, y=view[col], mode='lines', name=col, line=dict(color='#00CC96', width=1.5)))
+        for level, color in levels:
+            fig.add_hline(y=level, line_dash="dash", line_color=color)
+        fig.update_layout(title=title, template="plotly_dark", height=350, hovermode="x unified")
+        st.plotly_chart(fig, use_container_width=True)
+
+# ==============================================================================
+# TAB 6: DIAGNOSTICS (LATENCY / CACHES / FAILURES)
+# ==============================================================================
+def diagnostics_tab():
+    st.markdown("*> Where the time goes: fetch latency, retries, rate limits, cache efficiency, recent failures (this server process)*")
+    snap = metrics.snapshot()
+
+    d1, d2 = st.columns(2)
+    d1.download_button("⬇️ Metrics (JSON)", metrics.REGISTRY.to_json(), file_name="metrics.json", mime="application/json")
+    d2.download_button("⬇️ Metrics (Prometheus)", metrics.REGISTRY.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+
+    st.subheader("Latency")
+    if snap['histograms']:
+        lat = pd.DataFrame([{'Metric': h['name'], 'Labels': ", ".join(f"{k}={v}" for k, v in h['labels'].items()),
+                             'Count': h['count'], 'Mean (ms)': h['mean'] * 1e3, 'Max (ms)': h['max'] * 1e3,
+                             'Total (s)': h['sum']} for h in snap['histograms']])
+        st.dataframe(lat.style.format({'Mean (ms)': '{:.1f}', 'Max (ms)': '{:.1f}', 'Total (s)': '{:.2f}'}), use_container_width=True)
+    else:
+        st.info("Nothing timed yet in this process.")
+
+    st.subheader("Caches")
+    caches = pd.DataFrame(snap['caches'])
+    if not caches.empty:
+        caches['Hit Rate'] = caches['hits'] / (caches['hits'] + caches['misses']).where(lambda n: n > 0)
+        st.dataframe(caches.style.format({'Hit Rate': '{:.0%}'}, na_rep="-"), use_container_width=True)
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.subheader("Counters")
+        if snap['counters']:
+            st.dataframe(pd.DataFrame([{'Metric': c['name'], 'Labels': ", ".join(f"{k}={v}" for k, v in c['labels'].items()),
+                                        'Value': c['value']} for c in snap['counters']]), use_container_width=True)
+    with c2:
+        st.subheader("Recent Failures")
+        if snap['failures']:
+            fails = pd.DataFrame(snap['failures'][::-1])
+            fails['time'] = pd.to_datetime(fails['time'], unit='s').dt.strftime('%H:%M:%S')
+            st.dataframe(fails, use_container_width=True)
+        else:
+            st.success("No failures recorded.")
+
+# --- TABS ---
+# on_change="rerun" makes the tabs stateful, so only the open tab loads its data and builds charts
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["🚀 Momentum Scanner", "🐋 COT Data (Statistical Depth)", "🧪 Strategy Backtest", "🔗 Cross-Asset Risk", "🧭 Macro Regime", "🩺 Diagnostics"], key="main_tab", on_change="rerun")
+# Each rerun is timed per tab, so a slow tab shows up on the Diagnostics tab
+for tab, render_tab in [(tab1, momentum_tab), (tab2, cot_tab), (tab3, backtest_tab), (tab4, risk_tab), (tab5, macro_tab), (tab6, diagnostics_tab)]:
+    with tab:
+        if tab.open:
+            with metrics.timer("dashboard_render_seconds", tab=render_tab.__name__):
+                render_tab()
\ No newline at end of file
@@ -1,8 +1,16 @@
-import yfinance as yf
-import pandas as pd
-import time
+import argparse
 from datetime import datetime
 
+from core import metrics
+from core.export import FORMATS, ReportWriter, append_history, render, report_path
+from core.lazy import lazy
+from core.macro import INFLATION_RISING, MOVE_CRISIS, MOVE_STRESS, SPREAD_FLAT, rescale_yield, signal_frame
+from core.market_data import close_prices, symbol_history
+from core.store import default_store
+
+# Loaded on first use: `--help` and `import macro_scanner` stay cheap
+pd = lazy("pandas")
+
 # --- MASTER CONFIGURATION ---
 # This list contains every major asset class and economic indicator
 assets = [
@@ -40,44 +48,38 @@ assets = [
     {"symbol": "000001.SS", "name": "China (Shanghai Composite)", "type": "INDEX"} 
 ]
 
-def get_market_data(asset):
+def get_market_data(asset, prices):
     symbol = asset['symbol']
     print(f"Analyzing {asset['name']} ({symbol})...", end=" ", flush=True)
     
     try:
-        # Fetch 3 months of history to ensure we have enough data for the 20-day lookback
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="3mo") 
+        # Slice this asset out of the batched 3-month download
+        hist = symbol_history(prices, symbol)
         
         # Validation 1: No Data
         if hist.empty:
+            metrics.failure("macro.asset", "NO_DATA", symbol=symbol)
             print("FAILED (No Data).")
             return None
         
         # Validation 2: Short History
         hist = hist.dropna()
         if len(hist) < 25:
+             metrics.failure("macro.asset", "SHORT_HISTORY", symbol=symbol)
              print("FAILED (Not enough history).")
              return None
 
-        # --- DATA EXTRACTION ---
-        price_now = hist['Close'].iloc[-1]
-        price_1mo = hist['Close'].iloc[-21] # Approx 20 trading days ago
-        price_1wk = hist['Close'].iloc[-6]  # Approx 1 week ago
-        
         # --- SPECIAL LOGIC FOR YIELDS ---
-        # Yahoo often stores yields as whole numbers (e.g., 42.50 for 4.25%). 
-        # We normalize this for the spreadsheet.
+        # Yahoo often stores yields as whole numbers (e.g., 42.50 for 4.25%).
+        # Normalized over the whole series so momentum compares like with like.
+        close = hist['Close']
         if asset['type'] == "BOND_YIELD":
-             if price_now > 20: # Heuristic: If yield > 20%, it's likely scaled by 10
-                 raw_price = price_now / 10
-                 display_price = f"{raw_price:.2f}%"
-             else:
-                 raw_price = price_now
-                 display_price = f"{raw_price:.2f}%"
-        else:
-             raw_price = price_now
-             display_price = round(price_now, 4)
+             close = rescale_yield(close)
+
+        # --- DATA EXTRACTION ---
+        raw_price = close.iloc[-1]
+        price_1mo = close.iloc[-21] # Approx 20 trading days ago
+        price_1wk = close.iloc[-6]  # Approx 1 week ago
 
         # --- MOMENTUM CALCULATION ---
         mom = ((raw_price - price_1mo) / price_1mo) * 100
@@ -93,31 +95,42 @@ def get_market_data(asset):
 
         print(f"DONE. ({mom:.2f}%)")
         
+        # Numbers stay numbers; "4.25%" style strings only appear in the final render
         return {
             "Asset": asset['name'], 
-            "Price": display_price, 
-            "20D Momentum": f"{mom:.2f}%", 
+            "Price": float(raw_price), 
+            "20D Momentum": float(mom), 
             "Trend": trend,
             "State": state,
-            "Type": asset['type'],
-            "Raw": raw_price # Hidden column for macro calculations
+            "Type": asset['type']
         }
 
     except Exception as e:
+        metrics.failure("macro.asset", e, symbol=symbol)
         print(f"ERROR: {e}")
         return None
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Macro & market momentum scanner.")
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet", help="Report file format (streamed as results arrive)")
+    parser.add_argument("--excel", action="store_true", help="Also write the formatted ranking as .xlsx")
+    parser.add_argument("--metrics", help="Write run metrics here (.prom/.txt = Prometheus text, else JSON)")
+    args = parser.parse_args()
+
     print(f"--- MACRO & MARKET SCANNER: {datetime.now().strftime('%H:%M:%S')} ---")
     results = []
     
     # 1. Fetch Data
-    for asset in assets:
-        data = get_market_data(asset)
-        if data:
-            results.append(data)
-        # Small delay to be polite to Yahoo's servers
-        time.sleep(1) 
+    # Local store first; only bars after the last stored date go over the network
+    # (3 months covers the 20-day lookback)
+    prices = default_store().history([a['symbol'] for a in assets], period="3mo")
+    filename = report_path("Macro_Scanner", args.format)
+    with ReportWriter(filename, args.format) as writer:
+        for asset in assets:
+            data = get_market_data(asset, prices)
+            if data:
+                results.append(data)
+                writer.write(data)
 
     if results:
         df = pd.DataFrame(results)
@@ -127,68 +140,67 @@ if __name__ == "__main__":
         print("      MACRO ECONOMIC DASHBOARD      ")
         print("="*40)
         
+        # Today's row of the shared signal engine (same series the dashboard charts)
+        signals = signal_frame(close_prices(prices)).iloc[-1]
+
         # A. YIELD SPREAD CHECK (10Y - 5Y)
         # Note: We use 5Y as a proxy for Short Term because 2Y data is often restricted.
-        try:
-            yield_10 = df.loc[df['Asset'] == "US 10-Year Yield", 'Raw'].values[0]
-            yield_5 = df.loc[df['Asset'] == "US 5-Year Yield", 'Raw'].values[0]
-            spread = yield_10 - yield_5
-            
+        if pd.notna(signals['Spread']):
+            spread = signals['Spread']
             print(f"Yield Curve (10Y - 5Y): {spread:.2f}%", end=" ")
             
             if spread < 0:
                 print(" -> [WARNING: INVERTED -> RECESSION SIGNAL]")
-            elif spread < 0.15:
+            elif spread < SPREAD_FLAT:
                 print(" -> [CAUTION: FLATTENING]")
             else:
                 print(" -> [NORMAL: POSITIVE GROWTH CURVE]")
-        except IndexError:
+        else:
             print("Yield Curve: Data Missing")
 
         # B. MOVE INDEX CHECK (Bond Volatility)
-        try:
-            if "MOVE Index (Bond Volatility)" in df['Asset'].values:
-                move = df.loc[df['Asset'] == "MOVE Index (Bond Volatility)", 'Raw'].values[0]
-                print(f"MOVE Index (Volatility): {move:.0f}", end="   ")
-                
-                if move > 120:
-                    print(" -> [DANGER: LIQUIDITY CRISIS RISK]")
-                elif move > 100:
-                    print(" -> [CAUTION: HIGH STRESS]")
-                else:
-                    print(" -> [STABLE: MARKET IS CALM]")
+        if pd.notna(signals['MOVE']):
+            move = signals['MOVE']
+            print(f"MOVE Index (Volatility): {move:.0f}", end="   ")
+            
+            if move > MOVE_CRISIS:
+                print(" -> [DANGER: LIQUIDITY CRISIS RISK]")
+            elif move > MOVE_STRESS:
+                print(" -> [CAUTION: HIGH STRESS]")
             else:
-                print("MOVE Index: Data Missing")
-        except:
-            print("MOVE Index: Calculation Error")
+                print(" -> [STABLE: MARKET IS CALM]")
+        else:
+            print("MOVE Index: Data Missing")
 
         # C. INFLATION CHECK
-        try:
-            if "Inflation Expectations (ETF)" in df['Asset'].values:
-                inf_mom = float(df.loc[df['Asset'] == "Inflation Expectations (ETF)", '20D Momentum'].values[0].strip('%'))
-                print(f"\nInflation Trend (RINF): {inf_mom:.2f}%", end=" ")
-                if inf_mom > 2.0:
-                     print(" -> [WARNING: INFLATION EXPECTATIONS RISING]")
-                else:
-                     print(" -> [STABLE]")
-        except:
-            pass
+        if pd.notna(signals['Inflation Trend']):
+            inf_mom = signals['Inflation Trend']
+            print(f"\nInflation Trend (RINF): {inf_mom:.2f}%", end=" ")
+            if inf_mom > INFLATION_RISING:
+                 print(" -> [WARNING: INFLATION EXPECTATIONS RISING]")
+            else:
+                 print(" -> [STABLE]")
 
         print("\n" + "="*40)
 
         # --- 3. SAVE & DISPLAY ---
-        # Remove helper columns before saving
-        final_df = df.drop(columns=['Raw', 'Type'])
-        
-        # Sort by Momentum to see the strongest movers first
-        # We need to temporarily clean the '%' to sort numerically
-        final_df['SortVal'] = final_df['20D Momentum'].astype(str).str.rstrip('%').astype(float)
-        final_df = final_df.sort_values(by='SortVal', ascending=False)
-        final_df = final_df.drop(columns=['SortVal'])
-        
-        filename = f"Macro_Scanner_{datetime.now().strftime('%Y%m%d')}.xlsx"
-        final_df.to_excel(filename, index=False)
+        # Sort by Momentum to see the strongest movers first (the column is still numeric)
+        ranked = df.sort_values(by='20D Momentum', ascending=False)
+        append_history(ranked, "Macro_Scanner")
+
+        # Final render: yields as percentages, everything else as a 4dp price
+        final_df = render(ranked, percent=['20D Momentum'])
+        is_yield = ranked['Type'] == "BOND_YIELD"
+        final_df['Price'] = [f"{p:.2f}%" if y else round(p, 4) for p, y in zip(ranked['Price'], is_yield)]
+        final_df = final_df.drop(columns=['Type'])
+
+        if args.excel:
+            final_df.to_excel(filename.rsplit(".", 1)[0] + ".xlsx", index=False)
         
         print("\n--- ASSET PERFORMANCE RANKING ---")
         print(final_df.to_string(index=False))
-        print(f"\n[SUCCESS] Report saved to Desktop: {filename}")
\ No newline at end of file
+        print(f"\n[SUCCESS] Report saved: {filename}")
+
+    if args.metrics:
+        metrics.REGISTRY.write(args.metrics)
+        print(f"Metrics written: {args.metrics}")
\ No newline at end of file
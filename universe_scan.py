@@ -0,0 +1,56 @@
+import argparse
+import os
+from datetime import datetime
+
+from core import metrics
+from core.lazy import lazy
+from core.scan import scan_universe, load_universe
+from core.store import default_store
+
+pd = lazy("pandas")
+
+COLUMNS = ["20D Momentum", "Symbol", "Price", "5D Momentum", "Trend", "State"]
+
+
+def show(title, rows):
+    print(f"\n--- {title} ---")
+    if not rows:
+        print("(no results)")
+        return
+    df = pd.DataFrame(rows, columns=COLUMNS)[["Symbol", "Price", "20D Momentum", "5D Momentum", "Trend", "State"]]
+    for col in ("20D Momentum", "5D Momentum"):
+        df[col] = df[col].map(lambda x: f"{x:.2f}%")
+    df["Price"] = df["Price"].round(4)
+    print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless 20D/5D momentum scan over a large symbol universe.")
+    parser.add_argument("universe", help="Symbol file: .txt (one per line) or .csv with a symbol/ticker column")
+    parser.add_argument("--top", type=int, default=25, help="How many leaders and laggards to keep")
+    parser.add_argument("--batch-size", type=int, default=200, help="Symbols per download batch")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="Batches downloading at once")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Scoring processes")
+    parser.add_argument("--use-store", action="store_true",
+                        help="Read/refresh through the local OHLCV store (faster warm re-scans, one file per symbol)")
+    parser.add_argument("--metrics", help="Write run metrics here (.prom/.txt = Prometheus text, else JSON)")
+    args = parser.parse_args()
+    fetch_kwargs = {"fetch": default_store().history} if args.use_store else {}
+
+    print(f"--- UNIVERSE SCAN: {datetime.now().strftime('%H:%M:%S')} ---")
+
+    def progress(requested, scored):
+        print(f"\rRequested {requested:,} symbols, scored {scored:,}...", end="", flush=True)
+
+    ranking, requested, scored = scan_universe(
+        load_universe(args.universe), k=args.top, batch_size=args.batch_size,
+        fetch_workers=args.fetch_workers, workers=args.workers, on_batch=progress, **fetch_kwargs
+    )
+    print(f"\rScanned {scored:,} of {requested:,} symbols ({requested - scored:,} failed or short history).")
+
+    show(f"TOP {args.top} MOMENTUM", ranking.top())
+    show(f"BOTTOM {args.top} MOMENTUM", ranking.bottom())
+
+    if args.metrics:
+        metrics.REGISTRY.write(args.metrics)
+        print(f"Metrics written: {args.metrics}")